@@ -2,10 +2,18 @@
 """Cross-platform SessionStart hook for Claude Code.
 
 Outputs state.json and handoffs.json contents on session start.
-Handles missing files gracefully without errors.
+Handles missing files gracefully without errors. Files that together exceed
+the context budget are printed as a compact digest instead (see
+scripts/lib/state_digest.py).
+
+Also records the session's terminal app and project identity under the CLI
+home (see scripts/lib/session_records.py) so the Stop hook can skip
+re-detecting them on every turn.
 """
 
+import os
 import sys
+from contextlib import nullcontext
 from pathlib import Path
 
 # Ensure UTF-8 stdout for Unicode characters (arrows, emoji, etc.)
@@ -16,6 +24,10 @@ if hasattr(sys.stdout, "buffer"):
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
 
 
+# Shared hook library, installed next to this hooks directory
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
 PRIMARY_STATE_PATH = Path(".state/state.json")
 LEGACY_STATE_PATH = Path(".claude/state.json")
 PRIMARY_HANDOFFS_PATH = Path(".state/handoffs.json")
@@ -41,9 +53,84 @@ def resolve_path(primary: Path, legacy: Path) -> Path:
     return primary
 
 
+def _stage(name: str):
+    """Time a stage into the hook latency histograms (scripts/hook_stats.py)."""
+    if not SCRIPTS_DIR.is_dir():
+        return nullcontext()
+    from lib.stage_timing import set_hook, span
+
+    set_hook("session_start")
+    return span(name)
+
+
+def _load_input_data() -> dict:
+    """Read the SessionStart payload (deadline-bounded; skipped on a TTY)."""
+    if not SCRIPTS_DIR.is_dir():
+        return {}
+    from lib.hook_input import read_hook_payload
+
+    return read_hook_payload()
+
+
+def record_session_context(input_data: dict) -> None:
+    """Resolve terminal and project once per session for the Stop hook."""
+    session_id = input_data.get("session_id")
+    if not session_id or not SCRIPTS_DIR.is_dir():
+        return
+
+    from lib.project_identity import get_project_name
+    from lib.session_records import sweep_session_records, write_session_record
+    from lib.terminal_app_detection import get_terminal_app
+
+    cwd = input_data.get("cwd") or os.getcwd()
+    write_session_record(session_id, cwd, get_terminal_app(), get_project_name(cwd))
+    sweep_session_records()
+
+
+def _run_profiled(func) -> None:
+    """Run under cProfile when CLAUDE_HOOKS_PROFILE is set (scripts/hook_profile.py)."""
+    if not SCRIPTS_DIR.is_dir():
+        func()
+        return
+    from lib.profiling import run_profiled
+
+    run_profiled("session_start", func)
+
+
 def main() -> None:
-    # State file
+    with _stage("stdin"):
+        input_data = _load_input_data()
+
+    with _stage("state"):
+        _print_state()
+
+    # Flush the context before the (slower) terminal detection runs
+    sys.stdout.flush()
+    try:
+        with _stage("session_record"):
+            record_session_context(input_data)
+    except Exception:
+        pass
+
+
+def _state_digest(state_path: Path, handoffs_path: Path) -> str | None:
+    """Budgeted digest of both files, or None to print them verbatim."""
+    if not SCRIPTS_DIR.is_dir():
+        return None
+    from lib.state_digest import render_digest
+
+    return render_digest(state_path, handoffs_path)
+
+
+def _print_state() -> None:
     state_path = resolve_path(PRIMARY_STATE_PATH, LEGACY_STATE_PATH)
+    handoffs_path = resolve_path(PRIMARY_HANDOFFS_PATH, LEGACY_HANDOFFS_PATH)
+    digest = _state_digest(state_path, handoffs_path)
+    if digest is not None:
+        print(digest, end="")
+        return
+
+    # State file
     state_content = read_file(state_path)
     if state_content:
         print(f"=== {state_path.as_posix()} ===")
@@ -53,7 +140,6 @@ def main() -> None:
         print('{"note": "No state.json found. Run /migrate to set up tracking."}')
 
     # Handoffs file
-    handoffs_path = resolve_path(PRIMARY_HANDOFFS_PATH, LEGACY_HANDOFFS_PATH)
     handoffs_content = read_file(handoffs_path)
     if handoffs_content:
         print(f"=== {handoffs_path.as_posix()} ===")
@@ -62,7 +148,7 @@ def main() -> None:
 
 if __name__ == "__main__":
     try:
-        main()
+        _run_profiled(main)
     except Exception:
         # Fail silently - don't break session start
         print(f"=== {PRIMARY_STATE_PATH.as_posix()} ===")
@@ -14,9 +14,12 @@ from .platform import (
     IS_WINDOWS,
     OUR_SCRIPTS,
     get_claude_dir,
+    get_hook_timeouts_path,
     get_settings_path,
 )
 
+DEFAULT_HOOK_TIMEOUT = 5
+
 # ---------------------------------------------------------------------------
 # Script / hook command helpers
 # ---------------------------------------------------------------------------
@@ -76,6 +79,29 @@ def backup_settings() -> Optional[Path]:
     return backup_path
 
 
+def load_hook_timeouts() -> dict:
+    """Hook event -> timeout seconds saved by the doctor, or {} if none."""
+    try:
+        with open(get_hook_timeouts_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {
+        event: value
+        for event, value in data.items()
+        if isinstance(value, int) and not isinstance(value, bool) and value > 0
+    }
+
+
+def save_hook_timeouts(timeouts: dict) -> None:
+    path = get_hook_timeouts_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(timeouts, f, indent=2)
+
+
 # ---------------------------------------------------------------------------
 # Hook filtering
 # ---------------------------------------------------------------------------
@@ -112,8 +138,15 @@ def _filter_hooks(hook_configs: list, exclude_scripts: list) -> list:
 # ---------------------------------------------------------------------------
 
 
-def get_full_config() -> dict:
-    """Get the complete configuration to merge."""
+def get_full_config(hook_timeouts: Optional[dict] = None) -> dict:
+    """Get the complete configuration to merge.
+
+    Hook timeouts come from hook_timeouts (event -> seconds), else from the
+    values saved by `install.py --doctor --apply-timeouts`, else
+    DEFAULT_HOOK_TIMEOUT.
+    """
+    if hook_timeouts is None:
+        hook_timeouts = load_hook_timeouts()
     return {
         "attribution": {"commit": ""},
         "permissions": {
@@ -138,7 +171,9 @@ def get_full_config() -> dict:
                         {
                             "type": "command",
                             "command": get_hook_command("session-start.py"),
-                            "timeout": 5,
+                            "timeout": hook_timeouts.get(
+                                "SessionStart", DEFAULT_HOOK_TIMEOUT
+                            ),
                         }
                     ]
                 }
@@ -149,7 +184,7 @@ def get_full_config() -> dict:
                         {
                             "type": "command",
                             "command": get_script_command("stop_hook.py"),
-                            "timeout": 5,
+                            "timeout": hook_timeouts.get("Stop", DEFAULT_HOOK_TIMEOUT),
                         }
                     ]
                 }
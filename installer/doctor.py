@@ -0,0 +1,394 @@
+"""Doctor mode: benchmark the installed hooks against their timeouts.
+
+Runs the hook scripts installed under ~/.claude (or ~/.codex) from a
+throwaway copy of that CLI home, so caches, queues and session records of
+the real install are left alone. Delivery is stubbed: the sound player and
+the detached notification worker are replaced with no-ops and terminal
+escape notifications go to the null device. Everything else (transcript
+parsing, terminal and project detection, focus probes) runs for real.
+
+For each hook it reports cold latency (first run: no bytecode, empty
+caches) and warm latency (the remaining runs), the external tools the
+capability probes found, and the imports that dominate start-up. From the
+slowest run it recommends a timeout for the hook config produced by
+claude_settings.get_full_config, and can save and apply it.
+"""
+
+import json
+import math
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from .claude_settings import (
+    backup_settings,
+    get_full_config,
+    load_hook_timeouts,
+    load_settings,
+    merge_settings,
+    save_hook_timeouts,
+    save_settings,
+)
+from .platform import CLI_INFO, PLATFORM_NAME, get_cli_dir
+
+DOCTOR_RUNS = 5
+RUN_TIMEOUT_SECONDS = 30
+
+# Recommended timeout: SAFETY_FACTOR times the slowest run, rounded up to
+# whole seconds and kept within [MIN_TIMEOUT_SECONDS, MAX_TIMEOUT_SECONDS].
+SAFETY_FACTOR = 3
+MIN_TIMEOUT_SECONDS = 3
+MAX_TIMEOUT_SECONDS = 30
+
+# Executables the hooks look up through lib/capabilities.py or spawn.
+TOOL_PROBES = ("terminal-notifier", "osascript", "notify-send", "paplay", "aplay", "tmux", "git")
+
+# Environment that would change what a run measures or where it writes.
+_SCRUBBED_ENV = ("CLAUDE_HOOKS_DAEMON", "CLAUDE_HOOKS_PROFILE", "CLAUDE_HOOKS_DEBUG")
+
+_SOUND_STUB = '''"""No-op sound player (install.py --doctor)."""
+
+
+def get_sound(sound_type):
+    return None
+
+
+def play_sound(sound_file):
+    pass
+'''
+
+_WORKER_STUB = '"""No-op notification worker (install.py --doctor)."""\n'
+
+_CAPABILITY_PROBE = """
+import json, sys
+sys.path.insert(0, sys.argv[1])
+from lib.capabilities import describe_capabilities, which
+from lib.platform_runtime import IS_WSL, get_powershell_exe
+for name in sys.argv[2:]:
+    which(name)
+if IS_WSL:
+    get_powershell_exe()
+print(json.dumps(describe_capabilities()))
+"""
+
+
+# ---------------------------------------------------------------------------
+# Sandbox and payloads
+# ---------------------------------------------------------------------------
+
+
+def _build_sandbox(cli: str, root: Path) -> Optional[Path]:
+    """Copy the installed scripts and hooks into root; None if not installed."""
+    installed = get_cli_dir(cli)
+    if not (installed / "scripts" / "stop_hook.py").is_file():
+        return None
+
+    cli_home = root / CLI_INFO[cli]["home"]
+    ignore = shutil.ignore_patterns("__pycache__", "*.pyc")
+    shutil.copytree(installed / "scripts", cli_home / "scripts", ignore=ignore)
+    if (installed / "hooks").is_dir():
+        shutil.copytree(installed / "hooks", cli_home / "hooks", ignore=ignore)
+    (cli_home / "scripts" / "sound_player.py").write_text(_SOUND_STUB, encoding="utf-8")
+    (cli_home / "scripts" / "notify_worker.py").write_text(_WORKER_STUB, encoding="utf-8")
+    return cli_home
+
+
+def _build_project(root: Path) -> tuple[Path, Path]:
+    """A project directory with session state and a realistic transcript."""
+    project = root / "project"
+    (project / ".state").mkdir(parents=True)
+    (project / ".state" / "state.json").write_text(
+        json.dumps(
+            {
+                "currentFocus": "Doctor run",
+                "backlog": [{"id": i, "title": f"Backlog item {i}"} for i in range(20)],
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+
+    transcript = root / "transcript.jsonl"
+    with open(transcript, "w", encoding="utf-8") as f:
+        for turn in range(200):
+            f.write(json.dumps({"type": "user", "message": {"role": "user", "content": f"Step {turn}"}}) + "\n")
+            f.write(
+                json.dumps(
+                    {
+                        "type": "user",
+                        "message": {
+                            "role": "user",
+                            "content": [
+                                {"type": "tool_result", "tool_use_id": f"toolu_{turn}", "content": "x" * 4000}
+                            ],
+                        },
+                    }
+                )
+                + "\n"
+            )
+            f.write(
+                json.dumps(
+                    {
+                        "type": "assistant",
+                        "message": {
+                            "role": "assistant",
+                            "content": [{"type": "text", "text": f"Updated the parser for step {turn}; tests pass."}],
+                        },
+                    }
+                )
+                + "\n"
+            )
+    return project, transcript
+
+
+def _hook_specs(cli: str, cli_home: Path, project: Path, transcript: Path) -> list:
+    """(label, settings hook event or None, command, stdin payload or None)."""
+    python = sys.executable
+    if cli == "codex":
+        payload = {
+            "type": "agent-turn-complete",
+            "cwd": str(project),
+            "last-assistant-message": "Updated the parser; tests pass.",
+        }
+        return [("notify", None, [python, str(cli_home / "scripts" / "stop_hook.py"), json.dumps(payload)], None)]
+
+    specs = []
+    if (cli_home / "hooks" / "session-start.py").is_file():
+        specs.append(
+            (
+                "SessionStart",
+                "SessionStart",
+                [python, str(cli_home / "hooks" / "session-start.py")],
+                {"hook_event_name": "SessionStart", "source": "startup", "cwd": str(project)},
+            )
+        )
+    specs.append(
+        (
+            "Stop",
+            "Stop",
+            [python, str(cli_home / "scripts" / "stop_hook.py")],
+            {"hook_event_name": "Stop", "cwd": str(project), "transcript_path": str(transcript)},
+        )
+    )
+    if (cli_home / "scripts" / "statusline.py").is_file():
+        specs.append(
+            (
+                "statusLine",
+                None,
+                [python, str(cli_home / "scripts" / "statusline.py")],
+                {
+                    "model": {"display_name": "Claude"},
+                    "workspace": {"current_dir": str(project)},
+                    "context_window": {"used_percentage": 42},
+                },
+            )
+        )
+    return specs
+
+
+def _doctor_env() -> dict:
+    env = {k: v for k, v in os.environ.items() if k not in _SCRUBBED_ENV}
+    env.update(
+        {
+            "CLAUDE_HOOKS_RATE_LIMIT_STOP": "off",
+            "CLAUDE_HOOKS_RATE_LIMIT_AGENT_TURN_COMPLETE": "off",
+            "CLAUDE_HOOKS_TTY": os.devnull,
+            "CLAUDE_HOOKS_STATS": "0",
+        }
+    )
+    return env
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+
+def _run_once(
+    command: list, payload: Optional[dict], cwd: Path, env: dict, extra_args: tuple = ()
+) -> tuple[Optional[float], str]:
+    """(wall milliseconds or None on timeout, stderr) for one hook run."""
+    start = time.perf_counter()
+    try:
+        result = subprocess.run(
+            [command[0], *extra_args, *command[1:]],
+            input=json.dumps(payload) if payload is not None else "",
+            capture_output=True,
+            text=True,
+            cwd=cwd,
+            env=env,
+            timeout=RUN_TIMEOUT_SECONDS,
+        )
+    except subprocess.TimeoutExpired:
+        return None, ""
+    return (time.perf_counter() - start) * 1000, result.stderr
+
+
+def _slowest_imports(stderr: str, count: int = 3) -> list:
+    """Top-level imports with the largest cumulative time in -X importtime output."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cumulative, name = line.split(":", 1)[1].split("|")
+            cumulative_us = int(cumulative)
+        except ValueError:
+            continue  # The header line
+        if not name.startswith("  "):  # Nested imports are indented further
+            imports.append((cumulative_us / 1000, name.strip()))
+    imports.sort(reverse=True)
+    return imports[:count]
+
+
+def _recommend_timeout(worst_ms: float) -> int:
+    seconds = math.ceil(worst_ms * SAFETY_FACTOR / 1000)
+    return max(MIN_TIMEOUT_SECONDS, min(MAX_TIMEOUT_SECONDS, seconds))
+
+
+def _current_timeout(settings: dict, event: str) -> Optional[int]:
+    """Timeout of our hook for event in settings.json, if installed."""
+    for config in settings.get("hooks", {}).get(event, []):
+        for hook in config.get("hooks", []):
+            command = hook.get("command", "")
+            if "stop_hook.py" in command or "session-start.py" in command:
+                return hook.get("timeout")
+    return None
+
+
+def _probe_tools(cli_home: Path, env: dict) -> dict:
+    try:
+        result = subprocess.run(
+            [sys.executable, "-c", _CAPABILITY_PROBE, str(cli_home / "scripts"), *TOOL_PROBES],
+            capture_output=True,
+            text=True,
+            env=env,
+            timeout=RUN_TIMEOUT_SECONDS,
+        )
+        return json.loads(result.stdout)
+    except (subprocess.TimeoutExpired, ValueError):
+        return {}
+
+
+def _format_ms(value: Optional[float]) -> str:
+    return "timeout" if value is None else f"{value:.0f}ms"
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+
+def run_doctor(cli: str, apply: bool = False, dry_run: bool = False, runs: int = DOCTOR_RUNS) -> bool:
+    """Benchmark the installed hooks for one CLI and recommend timeouts."""
+    print()
+    print(f"{CLI_INFO[cli]['name']} hook doctor ({PLATFORM_NAME})")
+    print("=" * 50)
+    print()
+
+    runs = max(runs, 2)
+    env = _doctor_env()
+    with tempfile.TemporaryDirectory(prefix="claude-hooks-doctor-") as tmp:
+        root = Path(tmp)
+        cli_home = _build_sandbox(cli, root)
+        if cli_home is None:
+            print(f"No installed hooks under {get_cli_dir(cli)}. Run install.py first.")
+            print()
+            return False
+        project, transcript = _build_project(root)
+        queue_path = cli_home / ".notify_queue.json"
+
+        print(f"Timing installed hooks ({runs} runs each, delivery stubbed)...")
+        results = []
+        for label, event, command, payload in _hook_specs(cli, cli_home, project, transcript):
+            timings = []
+            for index in range(runs):
+                # Every Stop run takes the full path: a fresh session (no
+                # session record) and no open coalescing window.
+                if payload is not None:
+                    payload = {**payload, "session_id": f"doctor-{index}"}
+                if queue_path.exists():
+                    queue_path.unlink()
+                timings.append(_run_once(command, payload, project, env)[0])
+            if queue_path.exists():
+                queue_path.unlink()
+            _, stderr = _run_once(command, payload, project, env, ("-X", "importtime"))
+            results.append((label, event, timings, _slowest_imports(stderr)))
+        tools = _probe_tools(cli_home, env)
+
+    settings = load_settings() if cli == "claude" else {}
+    saved = load_hook_timeouts() if cli == "claude" else {}
+    recommended = {}
+
+    print()
+    print(f"  {'HOOK':<14}{'COLD':>10}{'WARM P50':>10}{'WARM MAX':>10}{'TIMEOUT':>9}{'RECOMMEND':>11}")
+    for label, event, timings, _ in results:
+        cold, warm = timings[0], timings[1:]
+        finished = [t for t in warm if t is not None]
+        p50 = statistics.median(finished) if finished else None
+        warm_max = max(warm) if len(finished) == len(warm) else None
+        worst = None if cold is None or warm_max is None else max(cold, warm_max)
+        current = "-"
+        suggestion = "-"
+        if event is not None:
+            timeout = _current_timeout(settings, event)
+            current = f"{timeout}s" if timeout is not None else "unset"
+            recommended[event] = (
+                MAX_TIMEOUT_SECONDS if worst is None else _recommend_timeout(worst)
+            )
+            suggestion = f"{recommended[event]}s"
+        print(
+            f"  {label:<14}{_format_ms(cold):>10}{_format_ms(p50):>10}"
+            f"{_format_ms(warm_max):>10}"
+            f"{current:>9}{suggestion:>11}"
+        )
+    print()
+
+    print("External tools:")
+    if tools:
+        for key, path in sorted(tools.items()):
+            print(f"  {key:<28}{path or 'missing'}")
+    else:
+        print("  (capability probe failed)")
+    print()
+
+    print("Slowest imports (cumulative, warm run):")
+    for label, _, _, imports in results:
+        listed = ", ".join(f"{name} {ms:.1f}ms" for ms, name in imports) or "-"
+        print(f"  {label:<14}{listed}")
+    print()
+
+    if cli != "claude":
+        print("Codex runs notify without a timeout; nothing to apply.")
+        print()
+        return True
+
+    if not apply:
+        if any(recommended.get(e) != _current_timeout(settings, e) for e in recommended):
+            print("Run with --doctor --apply-timeouts to save and apply the recommended timeouts.")
+        else:
+            print("Hook timeouts already match the recommendation.")
+        print()
+        return True
+
+    if dry_run:
+        print(f"Would save hook timeouts {recommended} and update settings.json")
+        print()
+        return True
+
+    save_hook_timeouts({**saved, **recommended})
+    if settings:
+        backup = backup_settings()
+        if backup:
+            print(f"Backup: {backup.name}")
+    hooks_only = {"hooks": get_full_config({**saved, **recommended})["hooks"]}
+    save_settings(merge_settings(settings, hooks_only))
+    print("Saved hook timeouts; settings.json updated (restart Claude Code to apply).")
+    print()
+    return True
@@ -28,6 +28,7 @@ from .claude_settings import (
     save_settings,
 )
 from .codex_config import merge_codex_config, remove_codex_notify
+from .doctor import run_doctor
 from .file_ops import (
     install_codex_skills,
     run_install_steps,
@@ -260,6 +261,10 @@ def _run_in_wsl(args: argparse.Namespace) -> int:
         cmd.append("--dry-run")
     if args.uninstall:
         cmd.append("--uninstall")
+    if args.doctor:
+        cmd.append("--doctor")
+    if args.apply_timeouts:
+        cmd.append("--apply-timeouts")
 
     print("Re-launching installer inside WSL...")
     print(f"  wsl -e python3 {wsl_script}")
@@ -291,6 +296,16 @@ def main():
         action="store_true",
         help="Remove notification hooks (keeps commands/scripts)",
     )
+    parser.add_argument(
+        "--doctor",
+        action="store_true",
+        help="Benchmark the installed hooks and recommend timeouts",
+    )
+    parser.add_argument(
+        "--apply-timeouts",
+        action="store_true",
+        help="With --doctor: save the recommended hook timeouts to settings.json",
+    )
     parser.add_argument(
         "--wsl",
         action="store_true",
@@ -313,7 +328,9 @@ def main():
     success = True
 
     for cli in clis:
-        if args.uninstall:
+        if args.doctor:
+            success = run_doctor(cli, args.apply_timeouts, args.dry_run) and success
+        elif args.uninstall:
             if cli == "claude":
                 success = uninstall(args.dry_run) and success
             else:
@@ -63,3 +63,8 @@ def get_repo_dir() -> Path:
 
 def get_settings_path() -> Path:
     return get_claude_dir() / "settings.json"
+
+
+def get_hook_timeouts_path() -> Path:
+    """Per-machine hook timeouts chosen by `install.py --doctor --apply-timeouts`."""
+    return get_claude_dir() / "hook_timeouts.json"
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Resident notification daemon for the Stop/notify hook.
+
+Started on demand by lib/daemon_client.py when CLAUDE_HOOKS_DAEMON is enabled.
+Keeps the notification, sound and terminal-detection modules imported and
+their platform probes resolved, then forks a short-lived child per event so
+each one runs with the hook's own environment and working directory.
+
+Lifecycle:
+1. Take an exclusive lock under the CLI home (a second daemon exits at once)
+2. Bind a 0600 Unix socket next to it
+3. Fork one child per forwarded event; the child acknowledges as soon as
+   the request is parsed, then handles the event. Finished children are
+   reaped after each event and every DAEMON_POLL_SECONDS
+4. Exit after DAEMON_IDLE_SECONDS without events, or when the installed
+   scripts change so the next event picks up the new code
+"""
+
+import fcntl
+import json
+import os
+import socket
+import socketserver
+import sys
+import time
+from pathlib import Path
+
+from lib.daemon_client import LOCK_PATH, SOCKET_PATH
+from lib import stage_timing
+from lib.debug_log import flush as flush_log
+from lib.debug_log import log_event
+from lib.process_tree import pin_ancestors
+from lib.profiling import run_profiled
+
+import stop_hook
+
+# Warm the modules stop_hook.handle_event imports lazily, so forked children
+# inherit them instead of importing per event.
+import sound_player  # noqa: F401
+import lib.coalescing  # noqa: F401
+import lib.focus_detection  # noqa: F401
+import lib.notifications  # noqa: F401
+import lib.project_identity  # noqa: F401
+import lib.rate_limit  # noqa: F401
+import lib.session_records  # noqa: F401
+import lib.task_summary  # noqa: F401
+import lib.terminal_app_detection  # noqa: F401
+
+DAEMON_IDLE_SECONDS = 600
+# How often an idle daemon wakes to reap finished children and check for
+# updated scripts.
+DAEMON_POLL_SECONDS = 5
+
+_SCRIPTS_DIR = Path(__file__).resolve().parent
+
+
+def _code_stamp() -> float:
+    """Newest mtime across the installed hook scripts."""
+    newest = 0.0
+    for pattern in ("*.py", "lib/*.py"):
+        for path in _SCRIPTS_DIR.glob(pattern):
+            try:
+                newest = max(newest, path.stat().st_mtime)
+            except OSError:
+                pass
+    return newest
+
+
+class _EventHandler(socketserver.StreamRequestHandler):
+    """Runs in a forked child: adopt the caller's context and handle one event."""
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+            origin_pid = request.get("origin_pid")
+            if origin_pid:
+                # The client exits on the acknowledgement, and the hook shell
+                # right after it; record the ancestry terminal detection walks.
+                pin_ancestors(origin_pid)
+        except Exception as exc:
+            log_event("daemon.bad_request", error=exc)
+            self._reply(f"error: {exc}")
+            return
+        self._reply("accepted")
+
+        try:
+            os.environ.clear()
+            os.environ.update(request.get("env") or {})
+            cwd = request.get("cwd")
+            if cwd:
+                os.chdir(cwd)
+            run_profiled(
+                "daemon",
+                lambda: stop_hook.handle_event(
+                    request.get("payload") or {}, origin_pid=origin_pid
+                ),
+            )
+        except Exception as exc:
+            log_event("daemon.event_failed", error=exc)
+        # The child leaves through os._exit(), which skips atexit.
+        stage_timing.flush()
+        flush_log()
+
+    def _reply(self, status: str) -> None:
+        try:
+            self.wfile.write(json.dumps({"status": status}).encode("utf-8") + b"\n")
+            self.wfile.flush()
+            self.connection.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass  # The client gave up waiting; the event is still handled
+
+
+class _HookDaemon(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    timeout = DAEMON_POLL_SECONDS
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path, _EventHandler)
+        self.last_event = time.monotonic()
+
+    def process_request(self, request, client_address) -> None:
+        self.last_event = time.monotonic()
+        super().process_request(request, client_address)
+
+
+def main() -> None:
+    try:
+        lock_handle = open(LOCK_PATH, "w")
+        fcntl.flock(lock_handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return  # Another daemon owns the socket
+
+    # Anything still at the socket path is a leftover from a daemon that died.
+    try:
+        SOCKET_PATH.unlink()
+    except FileNotFoundError:
+        pass
+
+    old_umask = os.umask(0o077)
+    try:
+        server = _HookDaemon(str(SOCKET_PATH))
+    finally:
+        os.umask(old_umask)
+
+    log_event("daemon.listening", socket=SOCKET_PATH)
+    flush_log()
+    stamp = _code_stamp()
+    try:
+        while time.monotonic() - server.last_event < DAEMON_IDLE_SECONDS:
+            # Returns after one event or DAEMON_POLL_SECONDS. Only
+            # serve_forever() reaps on its own, so do it here: otherwise each
+            # event leaves a zombie and max_children is never enforced.
+            server.handle_request()
+            server.collect_children()
+            if _code_stamp() != stamp:
+                log_event("daemon.code_changed")
+                break
+    finally:
+        try:
+            SOCKET_PATH.unlink()
+        except FileNotFoundError:
+            pass
+        server.server_close()
+        lock_handle.close()
+    log_event("daemon.stopped")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
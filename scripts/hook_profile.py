@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Merge the most recent hook profiles (CLAUDE_HOOKS_PROFILE=1) and print the
+functions with the most cumulative time.
+
+Usage:
+    hook_profile.py                     # last 20 profiles, top 25 functions
+    hook_profile.py -n 50 --top 40      # more profiles / more rows
+    hook_profile.py --hook stop_hook    # one hook only (stop_hook, daemon,
+                                        # notify_worker, statusline, session_start)
+    hook_profile.py --sort tottime      # any pstats sort key
+    hook_profile.py --clear             # delete saved profiles
+"""
+
+import argparse
+import pstats
+import sys
+
+from lib.profiling import PROFILE_DIR, list_profiles
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--last", type=int, default=20, help="profiles to merge")
+    parser.add_argument("--top", type=int, default=25, help="functions to print")
+    parser.add_argument("--hook", help="only profiles of this hook")
+    parser.add_argument("--sort", default="cumulative", help="pstats sort key")
+    parser.add_argument("--clear", action="store_true", help="delete saved profiles")
+    args = parser.parse_args()
+
+    profiles = list_profiles(args.hook)
+    if args.clear:
+        for path in profiles:
+            path.unlink(missing_ok=True)
+        print(f"Removed {len(profiles)} profiles from {PROFILE_DIR}")
+        sys.exit(0)
+
+    stats = None
+    merged = 0
+    for path in profiles[: max(args.last, 1)]:
+        try:
+            if stats is None:
+                stats = pstats.Stats(str(path))
+            else:
+                stats.add(str(path))
+            merged += 1
+        except Exception:
+            continue  # Truncated or foreign file
+
+    if stats is None:
+        print(f"No hook profiles in {PROFILE_DIR} (run hooks with CLAUDE_HOOKS_PROFILE=1)")
+        sys.exit(0)
+
+    print(f"Merged {merged} of {len(profiles)} profiles from {PROFILE_DIR}")
+    stats.files = []  # Skip pstats' one-line-per-file header
+    stats.strip_dirs().sort_stats(args.sort).print_stats(args.top)
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Show per-stage hook latency histograms (p50/p90/p99/max, timeouts, fallbacks).
+
+Usage:
+    hook_stats.py           # print the report
+    hook_stats.py --reset   # clear recorded histograms
+"""
+
+import sys
+
+from lib.stage_timing import HISTOGRAM_PATH, percentile, read_histograms, reset
+
+if __name__ == "__main__":
+    if "--reset" in sys.argv[1:]:
+        reset()
+        print(f"Cleared {HISTOGRAM_PATH}")
+        sys.exit(0)
+
+    histograms = read_histograms()
+    if not histograms:
+        print(f"No hook timings in {HISTOGRAM_PATH}")
+        sys.exit(0)
+
+    header = (
+        f"{'HOOK':<14} {'STAGE':<16} {'COUNT':>7} {'P50':>9} {'P90':>9} "
+        f"{'P99':>9} {'MAX':>9} {'TIMEOUTS':>9} {'FALLBACKS':>10}"
+    )
+    print(header)
+    for histogram in sorted(histograms, key=lambda h: (h.hook, h.stage)):
+        cells = [
+            f"{percentile(histogram, fraction):.1f}ms" if histogram.count else "-"
+            for fraction in (0.50, 0.90, 0.99)
+        ]
+        max_ms = f"{histogram.max_ms:.1f}ms" if histogram.count else "-"
+        print(
+            f"{histogram.hook:<14} {histogram.stage:<16} {histogram.count:>7} "
+            f"{cells[0]:>9} {cells[1]:>9} {cells[2]:>9} {max_ms:>9} "
+            f"{histogram.timeouts:>9} {histogram.fallbacks:>10}"
+        )
@@ -0,0 +1,120 @@
+"""
+Persistent registry of external executables the hooks depend on.
+
+Notifiers and sound backends used to spawn `which` (or just try each player)
+on every event. Lookups here are resolved in-process with shutil.which and
+remembered in a small JSON file under the CLI home, negative results
+included. A found binary is revalidated with a single stat (its mtime must
+match) and re-resolved after CAPABILITY_TTL_SECONDS; a missing one is retried
+after MISSING_TTL_SECONDS. Changing PATH invalidates everything.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+import zlib
+from typing import Iterable, Optional
+
+from .platform_runtime import CLI_HOME
+
+CAPABILITY_CACHE_PATH = CLI_HOME / ".capabilities.json"
+CAPABILITY_TTL_SECONDS = 7 * 24 * 3600
+MISSING_TTL_SECONDS = 3600
+
+_cache: Optional[dict] = None
+
+
+def _path_fingerprint() -> str:
+    return f"{zlib.crc32(os.environ.get('PATH', '').encode('utf-8')):08x}"
+
+
+def _load() -> dict:
+    global _cache
+    if _cache is None:
+        try:
+            with open(CAPABILITY_CACHE_PATH, "r", encoding="utf-8") as handle:
+                data = json.load(handle)
+            if data.get("path_env") != _path_fingerprint():
+                raise ValueError("PATH changed")
+            _cache = data
+        except Exception:
+            _cache = {"path_env": _path_fingerprint(), "entries": {}}
+    return _cache
+
+
+def _save() -> None:
+    try:
+        tmp_path = CAPABILITY_CACHE_PATH.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(_load(), handle)
+        os.replace(tmp_path, CAPABILITY_CACHE_PATH)
+    except Exception:
+        pass
+
+
+def _mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _is_fresh(entry: dict) -> bool:
+    age = time.time() - entry.get("checked", 0)
+    path = entry.get("path")
+    if path is None:
+        return age < MISSING_TTL_SECONDS
+    return age < CAPABILITY_TTL_SECONDS and _mtime(path) == entry.get("mtime")
+
+
+def _resolve(key: str, probe) -> Optional[str]:
+    entries = _load()["entries"]
+    entry = entries.get(key)
+    if entry is not None and _is_fresh(entry):
+        return entry.get("path")
+
+    path = probe()
+    entries[key] = {
+        "path": path,
+        "mtime": _mtime(path) if path else None,
+        "checked": time.time(),
+    }
+    _save()
+    return path
+
+
+def which(name: str) -> Optional[str]:
+    """Cached shutil.which: full path of an executable on PATH, or None."""
+
+    def _which() -> Optional[str]:
+        # shutil is only needed on a cache miss, and importing it is costly.
+        import shutil
+
+        return shutil.which(name)
+
+    return _resolve(f"bin:{name}", _which)
+
+
+def first_available(names: Iterable[str]) -> Optional[tuple[str, str]]:
+    """Return (name, path) for the first executable found on PATH."""
+    for name in names:
+        path = which(name)
+        if path:
+            return name, path
+    return None
+
+
+def first_existing_file(key: str, candidates: Iterable[str]) -> Optional[str]:
+    """Cached lookup of the first candidate path that exists (e.g. outside PATH)."""
+    candidates = list(candidates)
+    return _resolve(
+        f"file:{key}",
+        lambda: next((path for path in candidates if os.path.isfile(path)), None),
+    )
+
+
+def describe_capabilities() -> dict[str, Optional[str]]:
+    """Snapshot of every cached probe and its resolved path (None = missing)."""
+    return {key: entry.get("path") for key, entry in _load()["entries"].items()}
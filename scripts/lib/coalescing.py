@@ -0,0 +1,188 @@
+"""
+Coalescing queue for completion notifications.
+
+The first completion after a quiet period is delivered immediately and opens
+a window of COALESCE_WINDOW_SECONDS. Completions arriving inside the window
+are queued instead of dropped; a detached flusher (stop_hook.py --flush-queue)
+wakes at the end of the window and delivers them as one aggregated toast and
+sound, e.g. "3 tasks finished" / "api, web". All state lives in one JSON file
+under the CLI home and is only touched while holding its lock, so concurrent
+hook processes (parallel sessions) can share it safely.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+from typing import Optional
+
+from .file_lock import locked, write_atomic
+from .debug_log import log_event
+from .platform_runtime import CLI_HOME, detached_env, spawn_detached
+
+COALESCE_WINDOW_SECONDS = 10
+MAX_PENDING = 50
+
+QUEUE_PATH = CLI_HOME / ".notify_queue.json"
+QUEUE_LOCK_PATH = CLI_HOME / ".notify_queue.lock"
+
+_STOP_HOOK = CLI_HOME / "scripts" / "stop_hook.py"
+
+
+def _empty_state() -> dict:
+    return {"window_end": 0.0, "pending": [], "flusher_since": None}
+
+
+def _load_state() -> dict:
+    try:
+        with open(QUEUE_PATH, "r", encoding="utf-8") as handle:
+            state = json.load(handle)
+        if isinstance(state, dict) and isinstance(state.get("pending"), list):
+            return state
+    except Exception:
+        pass
+    return _empty_state()
+
+
+def _save_state(state: dict) -> None:
+    try:
+        write_atomic(QUEUE_PATH, json.dumps(state, ensure_ascii=False).encode("utf-8"))
+    except Exception as exc:
+        log_event("coalesce.save_failed", error=exc)
+
+
+def claim_window() -> Optional[list[dict]]:
+    """Decide whether the current completion is delivered now or queued.
+
+    Returns None when a window is open (the caller should enqueue()). Otherwise
+    opens a new window and returns events left over from a flusher that never
+    ran, which the caller folds into its own delivery (usually an empty list).
+    """
+    with locked(QUEUE_LOCK_PATH) as ok:
+        if not ok:
+            return []
+        state = _load_state()
+        now = time.time()
+        if now < float(state.get("window_end", 0)):
+            return None
+        stale = state.get("pending", [])
+        state = _empty_state()
+        state["window_end"] = now + COALESCE_WINDOW_SECONDS
+        _save_state(state)
+        return stale
+
+
+def release_window() -> None:
+    """Close the window claim_window() just opened, for a completion that was
+    not delivered (its terminal was focused), unless events already queued
+    into it."""
+    with locked(QUEUE_LOCK_PATH) as ok:
+        if not ok:
+            return
+        state = _load_state()
+        if not state.get("pending"):
+            state["window_end"] = 0.0
+            _save_state(state)
+
+
+def enqueue(event: dict) -> bool:
+    """Queue an event for the end of the current window, starting a flusher if needed.
+
+    Returns False when the queue could not be locked; the caller should then
+    deliver the event itself instead of dropping it.
+    """
+    spawn = False
+    with locked(QUEUE_LOCK_PATH) as ok:
+        if not ok:
+            log_event("coalesce.queue_busy")
+            return False
+        state = _load_state()
+        state["pending"] = _cap_pending(state.get("pending", []) + [event])
+        flusher_since = state.get("flusher_since")
+        # A flusher that has been "running" for two windows is presumed dead.
+        if (
+            flusher_since is None
+            or time.time() - flusher_since > 2 * COALESCE_WINDOW_SECONDS
+        ):
+            state["flusher_since"] = time.time()
+            spawn = True
+        _save_state(state)
+
+    if spawn:
+        _spawn_flusher()
+    return True
+
+
+def _cap_pending(pending: list[dict]) -> list[dict]:
+    """Keep the newest MAX_PENDING events; older ones still count toward the
+    aggregated total through the oldest survivor's "folded" counter."""
+    if len(pending) <= MAX_PENDING:
+        return pending
+    trimmed, kept = pending[:-MAX_PENDING], pending[-MAX_PENDING:]
+    folded = sum(1 + event.get("folded", 0) for event in trimmed)
+    kept[0] = {**kept[0], "folded": kept[0].get("folded", 0) + folded}
+    return kept
+
+
+def _spawn_flusher() -> None:
+    try:
+        spawn_detached([sys.executable, str(_STOP_HOOK), "--flush-queue"], env=detached_env())
+    except Exception as exc:
+        log_event("coalesce.flusher_failed", error=exc)
+
+
+def drain_at_window_end() -> list[dict]:
+    """Flusher side: wait for the window to close, then take the queued events.
+
+    Draining re-opens the window so completions right after the aggregated
+    toast are coalesced too.
+    """
+    with locked(QUEUE_LOCK_PATH) as ok:
+        window_end = float(_load_state().get("window_end", 0)) if ok else 0.0
+    delay = min(max(window_end - time.time(), 0.0), COALESCE_WINDOW_SECONDS)
+    time.sleep(delay)
+
+    with locked(QUEUE_LOCK_PATH) as ok:
+        if not ok:
+            return []
+        state = _load_state()
+        events = state.get("pending", [])
+        state["pending"] = []
+        state["flusher_since"] = None
+        if events:
+            state["window_end"] = time.time() + COALESCE_WINDOW_SECONDS
+        _save_state(state)
+        return events
+
+
+def aggregate(events: list[dict]) -> dict:
+    """Merge events into one notification, collapsing identical messages.
+
+    Each event carries title, subtitle (project), message and app_name, plus
+    "folded" when it stands in for events trimmed past MAX_PENDING.
+    """
+    total = sum(1 + event.get("folded", 0) for event in events)
+    if total == 1:
+        return events[0]
+
+    projects: list[str] = []
+    counts: dict[str, int] = {}
+    for event in events:
+        project = event.get("subtitle", "")
+        if project and project not in projects:
+            projects.append(project)
+        message = event.get("message", "")
+        counts[message] = counts.get(message, 0) + 1
+
+    parts = [
+        f"{message} (×{count})" if count > 1 else message
+        for message, count in counts.items()
+    ]
+    app_names = {event.get("app_name", "") for event in events}
+    return {
+        "title": f"{total} tasks finished",
+        "subtitle": f"in {', '.join(projects)}" if projects else "",
+        "message": " · ".join(parts),
+        "app_name": app_names.pop() if len(app_names) == 1 else "",
+    }
@@ -0,0 +1,124 @@
+"""
+Context-growth forecast for the statusline.
+
+Each session keeps a small ring of (timestamp, context used) samples under
+FORECAST_DIR, keyed by the payload's session_id. A sample is added only when
+the usage changes, and a drop in usage (compaction, /clear) restarts the
+ring. From the last FORECAST_TURNS changes it derives the average growth per
+turn and the turns left until FORECAST_LIMIT_PERCENT.
+
+A "turn" here is a model response that changed the context usage, not a
+user prompt: usage only moves when a response lands, so a prompt answered
+through several tool calls counts once per call. That is the unit the
+forecast can observe from statusline payloads alone, without reading the
+transcript.
+
+Usage is counted in tokens when the payload carries context_window_size,
+otherwise in percentage points. The statusline only calls this when the
+payload changed, so an idle refresh costs nothing.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from .platform_runtime import CLI_HOME
+
+FORECAST_DIR = CLI_HOME / "context-samples"
+FORECAST_SAMPLES = 20
+FORECAST_TURNS = 5
+FORECAST_LIMIT_PERCENT = 90
+FORECAST_SWEEP_SECONDS = 7 * 24 * 3600
+
+_UNSAFE_ID_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class Forecast(NamedTuple):
+    per_turn: float  # tokens (or percentage points) per turn
+    turns_left: Optional[int]  # None once past the limit
+    in_tokens: bool
+
+
+def _samples_path(session_id: str) -> Optional[Path]:
+    safe_id = _UNSAFE_ID_CHARS.sub("", session_id or "")[:128].lstrip(".")
+    return FORECAST_DIR / f"{safe_id}.json" if safe_id else None
+
+
+def _load(path: Path) -> list:
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            samples = json.load(handle)
+        return [
+            (float(ts), float(used)) for ts, used in samples if isinstance(used, (int, float))
+        ]
+    except (OSError, ValueError, TypeError):
+        return []
+
+
+def _save(path: Path, samples: list) -> None:
+    try:
+        FORECAST_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(samples, handle)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def record_and_forecast(session_id: str, context_window: dict) -> Optional[Forecast]:
+    """Record the session's current usage and forecast from its recent turns.
+
+    Returns None until there are at least two turns of growth to go on.
+    """
+    path = _samples_path(session_id)
+    if path is None:
+        return None
+    try:
+        percent = float(context_window.get("used_percentage") or 0)
+        size = float(context_window.get("context_window_size") or 0)
+    except (TypeError, ValueError):
+        return None
+    in_tokens = size > 0
+    used = percent * size / 100 if in_tokens else percent
+    limit = FORECAST_LIMIT_PERCENT * size / 100 if in_tokens else FORECAST_LIMIT_PERCENT
+
+    samples = _load(path)
+    if not samples:
+        _sweep()
+    if not samples or used != samples[-1][1]:
+        if samples and used < samples[-1][1]:
+            samples = []  # Compacted or cleared: earlier growth no longer applies
+        samples.append((time.time(), used))
+        samples = samples[-FORECAST_SAMPLES:]
+        _save(path, samples)
+
+    recent = samples[-(FORECAST_TURNS + 1):]
+    if len(recent) < 3:
+        return None
+    per_turn = (recent[-1][1] - recent[0][1]) / (len(recent) - 1)
+    if used >= limit:
+        turns_left = None
+    else:
+        turns_left = int((limit - used) // per_turn) if per_turn > 0 else None
+    return Forecast(per_turn, turns_left, in_tokens)
+
+
+def _sweep() -> None:
+    """Delete the samples of sessions idle past the sweep age."""
+    cutoff = time.time() - FORECAST_SWEEP_SECONDS
+    try:
+        entries = list(FORECAST_DIR.iterdir())
+    except OSError:
+        return
+    for path in entries:
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,105 @@
+"""
+Thin client for the optional resident hook daemon.
+
+When CLAUDE_HOOKS_DAEMON is enabled, stop_hook.py forwards its payload to a
+long-lived daemon (scripts/hook_daemon.py) over a Unix domain socket under the
+CLI home, so the heavy imports and platform probes stay warm between events.
+This module must stay cheap to import: it is the only thing the client path
+loads besides platform_runtime.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+
+from .debug_log import log_event
+from .platform_runtime import CLI_HOME, controlling_tty_path, spawn_detached
+
+DAEMON_ENABLED = os.environ.get("CLAUDE_HOOKS_DAEMON", "").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# AF_UNIX and fork() come together (POSIX); checking fork avoids importing
+# socket on every hook run when the daemon is disabled.
+DAEMON_SUPPORTED = hasattr(os, "fork")
+
+SOCKET_PATH = CLI_HOME / ".hook-daemon.sock"
+LOCK_PATH = CLI_HOME / ".hook-daemon.lock"
+DAEMON_SCRIPT = CLI_HOME / "scripts" / "hook_daemon.py"
+
+# Connecting to a live daemon is local and instant; anything slower means the
+# socket is stale. The daemon acknowledges once it has parsed the request,
+# before handling the event, so a slow acknowledgement means it is wedged;
+# the deadline leaves the in-process fallback most of the 5s hook timeout.
+CONNECT_TIMEOUT = 0.2
+REPLY_TIMEOUT = 1.0
+
+
+def build_request(input_data: dict) -> dict:
+    """Bundle the payload with the caller context the daemon cannot see."""
+    return {
+        "payload": input_data,
+        # The daemon has no terminal; tell it which one to write escape
+        # sequence notifications to.
+        "env": {**os.environ, "CLAUDE_HOOKS_TTY": controlling_tty_path()},
+        "cwd": os.getcwd(),
+        # The client exits right after the reply; its parent (the CLI's hook
+        # shell) is where terminal detection should start walking.
+        "origin_pid": os.getppid(),
+    }
+
+
+def spawn_daemon() -> None:
+    """Start the daemon detached; it exits on its own if one is already running."""
+    try:
+        spawn_detached([sys.executable, str(DAEMON_SCRIPT)])
+        log_event("daemon.spawned")
+    except Exception as exc:
+        log_event("daemon.spawn_failed", error=exc)
+
+
+def forward_to_daemon(input_data: dict) -> bool:
+    """Hand the event to the resident daemon.
+
+    Returns True once the daemon has acknowledged the event as accepted.
+    Returns False when the caller should fall back to in-process handling:
+    daemon disabled, unsupported, not running yet (it is then spawned for
+    next time), or not acknowledging (wedged, or replying with an error).
+    """
+    if not (DAEMON_ENABLED and DAEMON_SUPPORTED):
+        return False
+
+    import socket
+
+    request = json.dumps(build_request(input_data)).encode("utf-8") + b"\n"
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(str(SOCKET_PATH))
+    except OSError:
+        sock.close()
+        spawn_daemon()
+        return False
+
+    try:
+        sock.settimeout(REPLY_TIMEOUT)
+        sock.sendall(request)
+        sock.shutdown(socket.SHUT_WR)
+        reply = sock.makefile("rb").readline()
+    except OSError as exc:
+        log_event("daemon.reply_failed", error=exc)
+        return False
+    finally:
+        sock.close()
+
+    try:
+        status = json.loads(reply).get("status")
+    except (ValueError, AttributeError):
+        status = None
+    log_event("daemon.reply", status=status)
+    # Only an acknowledged event is the daemon's; anything else is handled
+    # here, even if that risks a rare duplicate over a lost notification.
+    return status == "accepted"
@@ -0,0 +1,58 @@
+"""
+Deadline-bounded concurrent stage runner for hook pipelines.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, NamedTuple
+
+
+class Stage(NamedTuple):
+    """One independent probe: a callable, its latency budget and its fallback."""
+
+    func: Callable[[], Any]
+    budget: float
+    default: Any
+
+
+def run_with_deadlines(stages: dict[str, Stage]) -> tuple[dict[str, Any], list[str]]:
+    """Run every stage concurrently and collect results within their budgets.
+
+    Each stage gets its own daemon thread, so a probe that overruns is simply
+    abandoned: it cannot delay the hook's exit the way a ThreadPoolExecutor
+    worker would (those are joined at interpreter shutdown).
+
+    Returns (results, missed) where results maps each stage name to its value
+    or its default, and missed lists stages that timed out or raised.
+    """
+    results: dict[str, Any] = {}
+    failed: set[str] = set()
+
+    def _runner(name: str, func: Callable[[], Any]) -> None:
+        try:
+            results[name] = func()
+        except Exception:
+            failed.add(name)
+
+    start = time.monotonic()
+    threads = {}
+    for name, stage in stages.items():
+        thread = threading.Thread(
+            target=_runner, args=(name, stage.func), name=f"stage-{name}", daemon=True
+        )
+        thread.start()
+        threads[name] = thread
+
+    missed: list[str] = []
+    for name, thread in threads.items():
+        thread.join(max(0.0, start + stages[name].budget - time.monotonic()))
+        if thread.is_alive() or name in failed or name not in results:
+            missed.append(name)
+
+    final = {
+        name: stage.default if name in missed else results[name]
+        for name, stage in stages.items()
+    }
+    return final, missed
@@ -0,0 +1,142 @@
+"""
+Buffered, structured debug log for the hooks.
+
+Enabled with CLAUDE_HOOKS_DEBUG=1. Records are dicts buffered in memory and
+written to notification_debug.log as JSON lines in one append when the
+process exits (or on flush()), so a Stop event costs one open/write instead
+of one per message. Every record carries the process-wide context set with
+set_context() — the event id and session id — plus wall-clock and elapsed
+time; lib/stage_timing.py adds a "span" record per timed stage.
+
+The log rotates by size: once it passes LOG_MAX_BYTES it is shifted to
+.1, .2, ... keeping LOG_GENERATIONS old files.
+
+With debugging off every entry point returns immediately; call sites pass
+raw values as keyword fields and nothing is formatted or serialized.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import time
+from typing import Any
+
+from .platform_runtime import DEBUG_LOG_PATH, debug_enabled
+
+LOG_MAX_BYTES = 1024 * 1024
+LOG_GENERATIONS = 3
+
+_LOG_LOCK_PATH = DEBUG_LOG_PATH.with_name(DEBUG_LOG_PATH.name + ".lock")
+
+# Context travels to detached children (notify worker, queue flusher)
+# through the environment, so their records join the originating event.
+_CONTEXT_ENV = {"event_id": "CLAUDE_HOOKS_EVENT_ID", "session_id": "CLAUDE_HOOKS_SESSION_ID"}
+
+_records: list[dict] = []
+_context: dict[str, Any] = {
+    field: os.environ[name] for field, name in _CONTEXT_ENV.items() if name in os.environ
+}
+_start = time.monotonic()
+_atexit_registered = False
+
+
+def new_event_id() -> str:
+    """Short random id tying together the records of one hook event."""
+    return os.urandom(6).hex()
+
+
+def set_context(**fields: Any) -> None:
+    """Fields added to every later record of this process (event_id, session_id)."""
+    if not debug_enabled():
+        return
+    _context.update(fields)
+    for field, value in fields.items():
+        name = _CONTEXT_ENV.get(field)
+        if name and value is not None:
+            os.environ[name] = str(value)
+        elif name:
+            os.environ.pop(name, None)
+
+
+def log_event(event: str, **fields: Any) -> None:
+    """Buffer one record; values are serialized (str() as a fallback) at flush."""
+    if not debug_enabled():
+        return
+    global _atexit_registered
+    if not _atexit_registered:
+        atexit.register(flush)
+        _atexit_registered = True
+    _records.append(
+        {
+            "ts": time.time(),
+            "elapsed_ms": round((time.monotonic() - _start) * 1000, 2),
+            "pid": os.getpid(),
+            **_context,
+            "event": event,
+            **fields,
+        }
+    )
+
+
+def _rotate() -> None:
+    """Shift notification_debug.log → .1 → .2 ..., dropping the oldest."""
+    base = str(DEBUG_LOG_PATH)
+    for generation in range(LOG_GENERATIONS, 0, -1):
+        source = base if generation == 1 else f"{base}.{generation - 1}"
+        try:
+            os.replace(source, f"{base}.{generation}")
+        except OSError:
+            pass
+
+
+def _rotate_if_needed(incoming: int) -> None:
+    try:
+        if os.path.getsize(DEBUG_LOG_PATH) + incoming <= LOG_MAX_BYTES:
+            return
+    except OSError:
+        return
+    from .file_lock import locked
+
+    with locked(_LOG_LOCK_PATH, timeout=0.5) as ok:
+        if not ok:
+            return
+        # Another process may have rotated while we waited for the lock.
+        try:
+            if os.path.getsize(DEBUG_LOG_PATH) + incoming > LOG_MAX_BYTES:
+                _rotate()
+        except OSError:
+            pass
+
+
+def flush() -> None:
+    """Write buffered records in a single append. Never raises."""
+    if not _records:
+        return
+    try:
+        data = "".join(
+            json.dumps(record, ensure_ascii=False, default=str) + "\n"
+            for record in _records
+        ).encode("utf-8")
+        _records.clear()
+        _rotate_if_needed(len(data))
+        fd = os.open(DEBUG_LOG_PATH, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+    except Exception:
+        pass
+
+
+def _reset_after_fork() -> None:
+    # A forked child (the hook daemon's per-event handlers) inherits the
+    # parent's buffer and clock; it must only write its own records.
+    global _start
+    _records.clear()
+    _start = time.monotonic()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
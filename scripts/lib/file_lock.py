@@ -0,0 +1,80 @@
+"""
+Cross-process advisory file locking for shared hook state.
+
+Several hook processes (parallel sessions) update the same small state files,
+so every read-modify-write goes through locked(). POSIX uses fcntl.flock;
+Windows locks the first byte of the lock file with msvcrt.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from .platform_runtime import IS_WINDOWS
+
+if IS_WINDOWS:
+    import msvcrt
+else:
+    import fcntl
+
+
+def _try_lock(fd: int) -> bool:
+    try:
+        if IS_WINDOWS:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(fd: int) -> None:
+    try:
+        if IS_WINDOWS:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    except OSError:
+        pass
+
+
+@contextmanager
+def locked(lock_path: Path, *, timeout: float = 2.0) -> Iterator[bool]:
+    """Hold an exclusive lock on lock_path for the duration of the block.
+
+    Yields True once the lock is held, or False if it could not be taken
+    within timeout (timeout=0 makes a single non-blocking attempt). Callers
+    decide whether to proceed unlocked or skip their update.
+    """
+    try:
+        fd = os.open(str(lock_path), os.O_RDWR | os.O_CREAT, 0o600)
+    except OSError:
+        yield False
+        return
+
+    acquired = _try_lock(fd)
+    deadline = time.monotonic() + timeout
+    while not acquired and time.monotonic() < deadline:
+        time.sleep(0.005)
+        acquired = _try_lock(fd)
+
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            _unlock(fd)
+        os.close(fd)
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Replace path with data so readers never see a half-written file."""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as handle:
+        handle.write(data)
+    os.replace(tmp_path, path)
@@ -4,28 +4,36 @@ Terminal focus detection helpers.
 
 from __future__ import annotations
 
-import subprocess
-
-from .platform_runtime import IS_MACOS, IS_WINDOWS
-
-if IS_WINDOWS:
-    import ctypes
-    import ctypes.wintypes
+import json
+import os
+import time
+from typing import Optional
+
+from .capabilities import which
+from .file_lock import write_atomic
+from .platform_runtime import CLI_HOME, IS_MACOS, IS_WINDOWS, run_quiet
+
+
+# Session records store the app name from MACOS_APP_INFO (the name `open -a`
+# and terminal-notifier take); System Events reports the process name, which
+# differs for some apps. Every name either may use, keyed by the record's.
+MACOS_PROCESS_ALIASES = {
+    "iterm": {"iterm", "iterm2"},
+    "visual studio code": {"visual studio code", "code"},
+}
 
 
-def is_terminal_focused_macos() -> bool:
-    """Check if a terminal or editor-with-terminal is frontmost on macOS."""
+def is_terminal_focused_macos(app_name: str = "") -> bool:
+    """Check if a terminal or editor-with-terminal is frontmost on macOS.
+    With app_name, only that app counts (the terminal the session runs in)."""
     try:
         script = 'tell application "System Events" to get name of first application process whose frontmost is true'
-        result = subprocess.run(
-            ["osascript", "-e", script],
-            capture_output=True,
-            text=True,
-            timeout=0.5,
-            stdin=subprocess.DEVNULL,
-        )
-        if result.returncode == 0:
-            frontmost_app = result.stdout.strip().lower()
+        ok, output = run_quiet(["osascript", "-e", script], timeout=0.5)
+        if ok:
+            frontmost_app = output.lower()
+            if app_name:
+                app_name = app_name.lower()
+                return frontmost_app in MACOS_PROCESS_ALIASES.get(app_name, {app_name})
             terminal_apps = [
                 "terminal",
                 "iterm",
@@ -50,6 +58,9 @@ def is_terminal_focused_macos() -> bool:
 def _get_foreground_process_name_windows() -> str:
     """Return the lowercase name of the foreground Windows process."""
     try:
+        import ctypes
+        import ctypes.wintypes
+
         user32 = ctypes.windll.user32
         kernel32 = ctypes.windll.kernel32
 
@@ -103,16 +114,102 @@ WINDOWS_TERMINAL_PROCESSES = {
 }
 
 
-def is_terminal_focused_windows() -> bool:
-    """Check if a terminal or editor is frontmost on Windows."""
+def is_terminal_focused_windows(app_name: str = "") -> bool:
+    """Check if a terminal or editor is frontmost on Windows.
+    With app_name, only that app's process counts."""
     process_name = _get_foreground_process_name_windows()
+    if app_name:
+        return process_name == app_name.lower()
     return bool(process_name) and process_name in WINDOWS_TERMINAL_PROCESSES
 
 
-def is_terminal_focused() -> bool:
-    """Check if a terminal or editor with terminal is currently focused."""
+# A pane only counts as watched if its client saw input this recently.
+TMUX_ACTIVITY_SECONDS = 60
+
+
+def is_terminal_focused_tmux() -> Optional[bool]:
+    """Check whether this process's tmux pane is the one being looked at.
+
+    Works without a GUI: the pane must be the active pane of the active
+    window in an attached session whose client was used recently. Returns
+    None outside tmux (or when tmux cannot be queried).
+    """
+    pane = os.environ.get("TMUX_PANE")
+    tmux = which("tmux") if os.environ.get("TMUX") and pane else None
+    if not tmux:
+        return None
+    ok, output = run_quiet(
+        [
+            tmux,
+            "display-message",
+            "-p",
+            "-t",
+            pane,
+            "#{pane_active} #{window_active} #{session_attached} #{client_activity}",
+        ],
+        timeout=0.5,
+    )
+    fields = output.split()
+    if not ok or len(fields) < 3:
+        return None
+    pane_active, window_active, attached = fields[0], fields[1], fields[2]
+    activity = int(fields[3]) if len(fields) > 3 and fields[3].isdigit() else 0
+    return (
+        pane_active == "1"
+        and window_active == "1"
+        and attached not in ("", "0")
+        and time.time() - activity < TMUX_ACTIVITY_SECONDS
+    )
+
+
+def is_terminal_focused(app_name: str = "") -> bool:
+    """Check if a terminal or editor with terminal is currently focused.
+    Inside tmux the pane itself is checked, on any platform."""
+    tmux_focus = is_terminal_focused_tmux()
+    if tmux_focus is not None:
+        return tmux_focus
     if IS_MACOS:
-        return is_terminal_focused_macos()
+        return is_terminal_focused_macos(app_name)
     if IS_WINDOWS:
-        return is_terminal_focused_windows()
+        return is_terminal_focused_windows(app_name)
     return False
+
+
+# =============================================================================
+# Cached probe for the Stop path
+# =============================================================================
+
+FOCUS_CACHE_PATH = CLI_HOME / ".focus_cache.json"
+FOCUS_CACHE_SECONDS = 3.0
+
+
+def is_terminal_focused_cached(app_name: str = "") -> bool:
+    """is_terminal_focused(), reusing a result from the last few seconds.
+
+    Bursts of completions then probe (osascript, tmux, Win32) only once.
+    Keyed by tmux pane or app so different sessions do not share answers.
+    """
+    key = os.environ.get("TMUX_PANE") or app_name or "*"
+    now = time.time()
+    try:
+        with open(FOCUS_CACHE_PATH, "r", encoding="utf-8") as handle:
+            cache = json.load(handle)
+    except Exception:
+        cache = {}
+
+    entry = cache.get(key)
+    if isinstance(entry, dict) and now - entry.get("ts", 0) < FOCUS_CACHE_SECONDS:
+        return bool(entry.get("focused"))
+
+    focused = is_terminal_focused(app_name)
+    cache = {
+        k: v
+        for k, v in cache.items()
+        if isinstance(v, dict) and now - v.get("ts", 0) < FOCUS_CACHE_SECONDS
+    }
+    cache[key] = {"focused": focused, "ts": now}
+    try:
+        write_atomic(FOCUS_CACHE_PATH, json.dumps(cache).encode("utf-8"))
+    except OSError:
+        pass
+    return focused
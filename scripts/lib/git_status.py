@@ -0,0 +1,158 @@
+"""
+Stale-while-revalidate git status for the statusline.
+
+`git status` can take seconds in a large repo, far too long for a statusline
+that renders on every refresh. cached_status() returns the last result
+recorded for a repo root at once and, when it is older than
+GIT_STATUS_TTL_SECONDS, starts a detached `statusline.py
+--refresh-git-status <root>` to recompute it.
+
+Each repo root has its own JSON file and lock under GIT_STATUS_DIR. A refresh
+holds the lock while git runs, so the statuslines of parallel sessions see it
+busy and do not start another; the "refresh_started" mark covers the gap
+between spawning a refresher and the refresher taking the lock. git runs with
+--no-optional-locks (never contending with the user's own git commands) and a
+hard timeout; a refresh that times out keeps the previous counts.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from .file_lock import locked, write_atomic
+from .platform_runtime import CLI_HOME, run_quiet, spawn_detached
+
+GIT_STATUS_DIR = CLI_HOME / "git-status"
+GIT_STATUS_TTL_SECONDS = 10
+GIT_STATUS_TIMEOUT_SECONDS = 5
+GIT_STATUS_SWEEP_SECONDS = 30 * 24 * 3600
+
+_STATUSLINE = CLI_HOME / "scripts" / "statusline.py"
+
+
+class GitStatus(NamedTuple):
+    dirty: int
+    ahead: Optional[int]  # None without an upstream
+    behind: Optional[int]
+    updated: float
+
+
+def _paths(root: str) -> tuple[Path, Path]:
+    name = f"{zlib.crc32(root.encode('utf-8', errors='replace')):08x}"
+    return GIT_STATUS_DIR / f"{name}.json", GIT_STATUS_DIR / f"{name}.lock"
+
+
+def _load(path: Path, root: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            entry = json.load(handle)
+        if isinstance(entry, dict) and entry.get("root") == root:
+            return entry
+    except (OSError, ValueError):
+        pass
+    return {"root": root}
+
+
+def _save(path: Path, entry: dict) -> None:
+    try:
+        GIT_STATUS_DIR.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, json.dumps(entry).encode("utf-8"))
+    except OSError:
+        pass
+
+
+def parse_porcelain_v2(output: str) -> tuple[int, Optional[int], Optional[int]]:
+    """(changed paths, ahead, behind) from `git status --porcelain=v2 --branch`."""
+    dirty = 0
+    ahead = behind = None
+    for line in output.splitlines():
+        if line.startswith("# branch.ab "):
+            try:
+                plus, minus = line.split()[2:4]
+                ahead, behind = int(plus), -int(minus)
+            except ValueError:
+                pass
+        elif line[:2] in ("1 ", "2 ", "u ", "? "):
+            dirty += 1
+    return dirty, ahead, behind
+
+
+def cached_status(root: str) -> Optional[GitStatus]:
+    """Last recorded status for a repo root (None if never computed), starting
+    a background refresh when it is stale."""
+    path, lock_path = _paths(root)
+    entry = _load(path, root)
+    now = time.time()
+    if now - entry.get("updated", 0) > GIT_STATUS_TTL_SECONDS:
+        _start_refresh(root, path, lock_path, now)
+    if "dirty" not in entry:
+        return None
+    return GitStatus(entry["dirty"], entry.get("ahead"), entry.get("behind"), entry["updated"])
+
+
+def _start_refresh(root: str, path: Path, lock_path: Path, now: float) -> None:
+    try:
+        GIT_STATUS_DIR.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return
+    with locked(lock_path, timeout=0) as ok:
+        if not ok:
+            return  # A refresh is running right now
+        entry = _load(path, root)
+        if now - entry.get("refresh_started", 0) < GIT_STATUS_TIMEOUT_SECONDS:
+            return  # Spawned a moment ago, not yet holding the lock
+        entry["refresh_started"] = now
+        _save(path, entry)
+        try:
+            spawn_detached([sys.executable, str(_STATUSLINE), "--refresh-git-status", root])
+        except OSError:
+            pass
+
+
+def refresh(root: str) -> None:
+    """Recompute a repo's status under its lock (the detached refresher)."""
+    path, lock_path = _paths(root)
+    with locked(lock_path, timeout=1.0) as ok:
+        if not ok:
+            return
+        entry = _load(path, root)
+        success, output = run_quiet(
+            [
+                "git",
+                "--no-optional-locks",
+                "-C",
+                root,
+                "status",
+                "--porcelain=v2",
+                "--branch",
+                "--untracked-files=normal",
+            ],
+            timeout=GIT_STATUS_TIMEOUT_SECONDS,
+        )
+        if success:
+            entry["dirty"], entry["ahead"], entry["behind"] = parse_porcelain_v2(output)
+        entry["updated"] = time.time()
+        entry.pop("refresh_started", None)
+        _save(path, entry)
+    _sweep()
+
+
+def _sweep() -> None:
+    """Drop the status and lock files of repos not refreshed in a long time."""
+    cutoff = time.time() - GIT_STATUS_SWEEP_SECONDS
+    try:
+        entries = list(GIT_STATUS_DIR.glob("*.json"))
+    except OSError:
+        return
+    for path in entries:
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                path.with_suffix(".lock").unlink(missing_ok=True)
+        except OSError:
+            pass
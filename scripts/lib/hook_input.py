@@ -0,0 +1,118 @@
+"""
+Hook payload input.
+
+Claude Code pipes the event JSON to the hook's stdin; Codex's `notify`
+integration passes it as the last command-line argument instead. stdin is
+never read blindly: an inherited TTY is skipped outright, and a pipe that
+never closes is read with select() under a short deadline and a byte cap, so
+a stray stdin can no longer hang the hook until the CLI kills it.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from typing import Optional
+
+STDIN_DEADLINE_SECONDS = 0.5
+STDIN_MAX_BYTES = 8 * 1024 * 1024
+
+
+def _payload_from_argv(argv: list[str]) -> Optional[dict]:
+    for arg in reversed(argv):
+        if arg.lstrip().startswith("{"):
+            try:
+                data = json.loads(arg)
+            except ValueError:
+                continue
+            if isinstance(data, dict):
+                return data
+    return None
+
+
+def _read_fd_select(fd: int, deadline: float, max_bytes: int) -> bytes:
+    import select
+
+    chunks: list[bytes] = []
+    total = 0
+    while total < max_bytes:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        ready, _, _ = select.select([fd], [], [], remaining)
+        if not ready:
+            break
+        chunk = os.read(fd, min(65536, max_bytes - total))
+        if not chunk:
+            break
+        chunks.append(chunk)
+        total += len(chunk)
+    return b"".join(chunks)
+
+
+def _read_fd_thread(fd: int, deadline: float, max_bytes: int) -> bytes:
+    """Windows fallback: select() only works on sockets there."""
+    chunks: list[bytes] = []
+
+    def _reader() -> None:
+        total = 0
+        while total < max_bytes:
+            chunk = os.read(fd, min(65536, max_bytes - total))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            total += len(chunk)
+
+    thread = threading.Thread(target=_reader, daemon=True)
+    thread.start()
+    thread.join(max(deadline - time.monotonic(), 0.0))
+    return b"".join(chunks)
+
+
+def read_stdin_bytes(
+    deadline_seconds: float = STDIN_DEADLINE_SECONDS,
+    max_bytes: int = STDIN_MAX_BYTES,
+) -> bytes:
+    """Whatever arrives on stdin before EOF, the deadline or the byte cap.
+
+    Returns b"" without reading when stdin is missing or a TTY.
+    """
+    stream = sys.stdin
+    if stream is None:
+        return b""
+    try:
+        if stream.isatty():
+            return b""
+        fd = stream.fileno()
+    except (OSError, ValueError):
+        return b""
+
+    deadline = time.monotonic() + deadline_seconds
+    try:
+        if sys.platform == "win32":
+            return _read_fd_thread(fd, deadline, max_bytes)
+        return _read_fd_select(fd, deadline, max_bytes)
+    except OSError:
+        return b""
+
+
+def read_hook_payload(argv: Optional[list[str]] = None) -> dict:
+    """Hook payload from a JSON argv argument (Codex) or stdin (Claude Code).
+
+    Falls back to an empty payload when neither yields a JSON object.
+    """
+    payload = _payload_from_argv(sys.argv[1:] if argv is None else argv)
+    if payload is not None:
+        return payload
+
+    raw = read_stdin_bytes()
+    if not raw.strip():
+        return {}
+    try:
+        data = json.loads(raw.decode("utf-8", errors="replace"))
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
@@ -88,6 +88,26 @@ def clean_message_for_notification(text: str) -> str:
     return text[:117] + "..."
 
 
+def leading_lines(text: str, limit: int) -> list[str]:
+    """Return up to `limit` stripped, non-empty lines from the start of text.
+
+    Walks newline by newline instead of splitting, so only the head of a
+    multi-megabyte message is ever copied.
+    """
+    lines: list[str] = []
+    pos = 0
+    length = len(text)
+    while pos < length and len(lines) < limit:
+        end = text.find("\n", pos)
+        if end < 0:
+            end = length
+        line = text[pos:end].strip()
+        if line:
+            lines.append(line)
+        pos = end + 1
+    return lines
+
+
 def should_skip_line(first_line: str) -> bool:
     """Check if a line is just a generic acknowledgment."""
     first_line_lower = first_line.lower()
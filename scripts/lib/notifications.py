@@ -3,16 +3,26 @@ Notification delivery utilities for Claude Code and Codex CLI hooks.
 Cross-platform: macOS, Windows, WSL, and Linux desktops with notify-send.
 """
 
+import json
+import os
+import sys
+from pathlib import Path
+
+from .capabilities import which
+from .debug_log import log_event
 from .platform_runtime import (
     CLI_NAME,
     IS_MACOS,
     IS_WSL,
     USES_WINDOWS_GUI,
-    log_debug,
+    detached_env,
     run_powershell,
     run_quiet,
+    spawn_detached,
 )
 
+_NOTIFY_WORKER = Path(__file__).resolve().parent.parent / "notify_worker.py"
+
 # =============================================================================
 # Shared Helpers
 # =============================================================================
@@ -102,9 +112,9 @@ def send_notification_macos(
 ) -> None:
     """Send macOS notification using terminal-notifier (preferred) or osascript."""
     # Try terminal-notifier first
-    found, terminal_notifier_path = run_quiet(["which", "terminal-notifier"])
+    terminal_notifier_path = which("terminal-notifier")
 
-    if found and terminal_notifier_path:
+    if terminal_notifier_path:
         try:
             cmd = [terminal_notifier_path, "-title", title, "-message", message]
             if subtitle:
@@ -117,15 +127,13 @@ def send_notification_macos(
 
             ok, _ = run_quiet(cmd, timeout=2)
             if ok:
-                log_debug(f"  → terminal-notifier SUCCESS: {title}")
+                log_event("notify.terminal_notifier", ok=True, title=title)
                 return
             else:
-                log_debug("  → terminal-notifier FAILED, falling back to osascript")
+                log_event("notify.terminal_notifier", ok=False)
 
         except Exception as e:
-            log_debug(
-                f"  → terminal-notifier FAILED: {str(e)}, falling back to osascript"
-            )
+            log_event("notify.terminal_notifier", ok=False, error=e)
 
     # Fallback to osascript
     try:
@@ -139,12 +147,14 @@ def send_notification_macos(
 
         ok, _ = run_quiet(["osascript", "-e", script], timeout=2)
         if ok:
-            log_debug(f"  → osascript SUCCESS: {title} | {subtitle} | {message[:50]}")
+            log_event(
+                "notify.osascript", ok=True, title=title, subtitle=subtitle, message=message
+            )
         else:
-            log_debug("  → osascript FAILED")
+            log_event("notify.osascript", ok=False)
 
     except Exception as e:
-        log_debug(f"  → NOTIFICATION FAILED: {str(e)}")
+        log_event("notify.osascript", ok=False, error=e)
 
 
 # =============================================================================
@@ -173,24 +183,24 @@ def _send_notification_windows(
         ps_script = _build_windows_toast_script(full_title, message)
         timeout = 5
 
-    label = "WSL balloon" if IS_WSL else "Windows toast"
+    backend = "notify.wsl_balloon" if IS_WSL else "notify.windows_toast"
 
     if blocking:
         try:
             result = run_powershell(ps_script, timeout=timeout)
             if result and result.returncode == 0:
-                log_debug(f"  → {label} SUCCESS: {full_title}")
+                log_event(backend, ok=True, title=full_title)
             else:
                 stderr = result.stderr[:100] if result and result.stderr else "no error"
-                log_debug(f"  → {label} issue: {stderr}")
+                log_event(backend, ok=False, stderr=stderr)
         except Exception as e:
-            log_debug(f"  → {label} FAILED: {str(e)}")
+            log_event(backend, ok=False, error=e)
     else:
         try:
             run_powershell(ps_script, fire_and_forget=True)
-            log_debug(f"  → {label} ASYNC launched: {full_title}")
+            log_event(backend, ok=True, detached=True, title=full_title)
         except Exception as e:
-            log_debug(f"  → {label} ASYNC failed: {str(e)}")
+            log_event(backend, ok=False, detached=True, error=e)
 
 
 # =============================================================================
@@ -202,9 +212,9 @@ def send_notification_linux(
     title: str, message: str, subtitle: str = "", app_name: str = ""
 ) -> None:
     """Send Linux desktop notifications via notify-send when available."""
-    found, notify_send_path = run_quiet(["which", "notify-send"])
-    if not found or not notify_send_path:
-        log_debug("  → notify-send not available on Linux")
+    notify_send_path = which("notify-send")
+    if not notify_send_path:
+        log_event("notify.notify_send", ok=False, error="not installed")
         return
 
     cmd = [notify_send_path]
@@ -217,9 +227,81 @@ def send_notification_linux(
 
     ok, _ = run_quiet(cmd, timeout=2)
     if ok:
-        log_debug(f"  → notify-send SUCCESS: {title}")
+        log_event("notify.notify_send", ok=True, title=title)
     else:
-        log_debug("  → notify-send FAILED")
+        log_event("notify.notify_send", ok=False)
+
+
+# =============================================================================
+# Terminal Escape Notifications (SSH / tmux / headless)
+# =============================================================================
+
+# Terminals that show OSC 777 ("notify;title;body") rather than OSC 9 toasts.
+_OSC777_TERMINALS = ("foot", "rxvt", "ghostty", "contour")
+_CONTROL_CHARS = dict.fromkeys([*range(0x20), 0x7F], " ")
+
+
+def prefers_terminal_notifications() -> bool:
+    """Whether escape-sequence delivery should take priority over desktop toasts.
+
+    True over SSH (a desktop toast would appear on the remote host, if at all),
+    on Linux sessions without a display server, and inside tmux on Linux when
+    notify-send is missing (a tmux server often outlives the desktop session
+    whose DISPLAY it inherited).
+    """
+    if os.environ.get("SSH_CONNECTION") or os.environ.get("SSH_TTY"):
+        return True
+    if IS_MACOS or USES_WINDOWS_GUI:
+        return False
+    if os.environ.get("TMUX") and not which("notify-send"):
+        return True
+    return not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+def _build_terminal_sequence(title: str, message: str, subtitle: str = "") -> bytes:
+    """OSC notification for the current terminal, wrapped for tmux passthrough,
+    followed by a plain BEL so tmux raises its bell/alert flag on the window."""
+    heading = f"{title} - {subtitle}" if subtitle else title
+    heading = heading.translate(_CONTROL_CHARS)
+    body = message.translate(_CONTROL_CHARS)
+
+    term = f"{os.environ.get('TERM_PROGRAM', '')} {os.environ.get('TERM', '')}".lower()
+    if any(name in term for name in _OSC777_TERMINALS):
+        osc = f"\033]777;notify;{heading.replace(';', ',')};{body.replace(';', ',')}\a"
+    else:
+        text = f"{heading}: {body}"
+        # "9;<digit>;" is a ConEmu/Windows Terminal sub-command (e.g. progress).
+        if text[:1].isdigit():
+            text = f"✓ {text}"
+        osc = f"\033]9;{text}\a"
+
+    if os.environ.get("TMUX"):
+        osc = "\033Ptmux;" + osc.replace("\033", "\033\033") + "\033\\"
+    return (osc + "\a").encode("utf-8", errors="replace")
+
+
+def send_notification_terminal(title: str, message: str, subtitle: str = "") -> bool:
+    """Write an OSC 9 / OSC 777 notification straight to the controlling TTY.
+
+    No processes are spawned. CLAUDE_HOOKS_TTY overrides the target device (the
+    hook daemon sets it, since it has no terminal of its own). Returns False
+    when there is no terminal to write to.
+    """
+    target = os.environ.get("CLAUDE_HOOKS_TTY") or "/dev/tty"
+    try:
+        fd = os.open(target, os.O_WRONLY | os.O_NOCTTY)
+    except OSError:
+        log_event("notify.terminal", ok=False, error="no tty", target=target)
+        return False
+    try:
+        os.write(fd, _build_terminal_sequence(title, message, subtitle))
+        log_event("notify.terminal", ok=True, title=title)
+        return True
+    except OSError as e:
+        log_event("notify.terminal", ok=False, error=e)
+        return False
+    finally:
+        os.close(fd)
 
 
 # =============================================================================
@@ -227,6 +309,28 @@ def send_notification_linux(
 # =============================================================================
 
 
+def _send_notification_detached(
+    title: str, message: str, subtitle: str = "", app_name: str = ""
+) -> bool:
+    """Hand the blocking fallback chain to a detached notify_worker.py process.
+    Returns False if the worker could not be started."""
+    fields = {
+        "title": title,
+        "message": message,
+        "subtitle": subtitle,
+        "app_name": app_name,
+    }
+    try:
+        spawn_detached(
+            [sys.executable, str(_NOTIFY_WORKER), json.dumps(fields)], env=detached_env()
+        )
+        log_event("notify.worker_launched", ok=True, title=title)
+        return True
+    except Exception as e:
+        log_event("notify.worker_launched", ok=False, error=e)
+        return False
+
+
 def send_notification(
     title: str,
     message: str,
@@ -236,7 +340,22 @@ def send_notification(
     blocking: bool = True,
 ) -> None:
     """Send desktop notification using platform-appropriate method.
-    When blocking=False, uses fire-and-forget on Windows (macOS is already fast)."""
+    Over SSH or without a display, a terminal escape-sequence notification is
+    tried first, in-process (a detached worker is only told the TTY through
+    CLAUDE_HOOKS_TTY).
+    When blocking=False, delivery runs in a detached worker process on every
+    platform so the caller can exit within milliseconds; if the worker cannot
+    be started, delivery falls back to running in-process."""
+    if prefers_terminal_notifications() and send_notification_terminal(
+        title, message, subtitle
+    ):
+        return
+
+    if not blocking and _send_notification_detached(
+        title, message, subtitle, app_name
+    ):
+        return
+
     if IS_MACOS:
         send_notification_macos(title, message, subtitle, app_name)
     elif USES_WINDOWS_GUI:
@@ -5,35 +5,30 @@ Low-level runtime environment helpers for hook scripts.
 from __future__ import annotations
 
 import os
-import subprocess
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+
+# subprocess is imported where processes are started: most hook runs never
+# need it, and it drags in selectors, signal and threading.
+if TYPE_CHECKING:
+    import subprocess
 
 # Use sys.platform instead of platform.system() because platform.system()
 # can trigger WMI deadlocks on Windows with newer Python runtimes.
 IS_WINDOWS = sys.platform == "win32"
 IS_MACOS = sys.platform == "darwin"
 
-IS_WSL = False
-if sys.platform == "linux":
-    try:
-        IS_WSL = "microsoft" in Path("/proc/version").read_text().lower()
-    except Exception:
-        pass
+# WSL kernels carry "microsoft" in their release string (WSL1 and WSL2);
+# uname is a syscall, so no /proc read is needed at import time.
+IS_WSL = sys.platform == "linux" and "microsoft" in os.uname().release.lower()
 
 USES_WINDOWS_GUI = IS_WINDOWS or IS_WSL
 
-POWERSHELL_EXE = "powershell.exe"
-if IS_WSL:
-    _ps_candidates = [
-        "/mnt/c/Windows/System32/WindowsPowerShell/v1.0/powershell.exe",
-        "/mnt/c/WINDOWS/System32/WindowsPowerShell/v1.0/powershell.exe",
-    ]
-    for _candidate in _ps_candidates:
-        if Path(_candidate).exists():
-            POWERSHELL_EXE = _candidate
-            break
+_WSL_POWERSHELL_CANDIDATES = (
+    "/mnt/c/Windows/System32/WindowsPowerShell/v1.0/powershell.exe",
+    "/mnt/c/WINDOWS/System32/WindowsPowerShell/v1.0/powershell.exe",
+)
 
 _LIB_DIR = Path(__file__).resolve().parent
 _SCRIPTS_DIR = _LIB_DIR.parent
@@ -41,28 +36,92 @@ CLI_HOME = _SCRIPTS_DIR.parent
 CLI_NAME = "Codex CLI" if CLI_HOME.name == ".codex" else "Claude Code"
 
 DEBUG_LOG_PATH = CLI_HOME / "notification_debug.log"
-DEBUG_ENABLED = os.environ.get("CLAUDE_HOOKS_DEBUG", "").lower() in ("1", "true", "yes")
 
 
-def log_debug(message: str, *, path: Optional[str] = None) -> None:
-    """Silently append to the debug log if debug logging is enabled."""
-    if not DEBUG_ENABLED:
-        return
+def debug_enabled() -> bool:
+    # Read per call: hook daemon children adopt each caller's environment.
+    return os.environ.get("CLAUDE_HOOKS_DEBUG", "").lower() in ("1", "true", "yes")
+
+
+def get_powershell_exe() -> str:
+    """PowerShell executable; on WSL the Windows-side path, via the capability cache."""
+    if not IS_WSL:
+        return "powershell.exe"
+    from .capabilities import first_existing_file
+
+    return (
+        first_existing_file("wsl-powershell", _WSL_POWERSHELL_CANDIDATES)
+        or "powershell.exe"
+    )
+
+
+def controlling_tty_path() -> str:
+    """Device path of the controlling terminal, or "" when there is none."""
     try:
-        target = path or DEBUG_LOG_PATH
-        with open(target, "a", encoding="utf-8") as handle:
-            handle.write(f"{message}\n")
-    except Exception:
-        pass
+        fd = os.open("/dev/tty", os.O_WRONLY | os.O_NOCTTY)
+    except (OSError, AttributeError):
+        return ""
+    try:
+        return os.ttyname(fd)
+    except OSError:
+        return ""
+    finally:
+        os.close(fd)
 
 
 def get_windows_subprocess_kwargs() -> dict:
     """Return subprocess kwargs for hiding the console window on Windows."""
     if IS_WINDOWS:
+        import subprocess
+
         return {"creationflags": subprocess.CREATE_NO_WINDOW}
     return {}
 
 
+def detached_env() -> dict:
+    """This environment plus CLAUDE_HOOKS_TTY naming our controlling terminal.
+
+    A detached process runs in its own session and cannot open /dev/tty, so
+    helpers that may write terminal notifications (the coalescing flusher,
+    the notification worker) are told which device to use instead.
+    """
+    env = dict(os.environ)
+    if not env.get("CLAUDE_HOOKS_TTY"):
+        tty = controlling_tty_path()
+        if tty:
+            env["CLAUDE_HOOKS_TTY"] = tty
+    return env
+
+
+def spawn_detached(cmd: list[str], env: Optional[dict] = None) -> subprocess.Popen:
+    """Start a process that outlives the hook and never blocks it.
+
+    No inherited stdio (the CLI waits for the hook's pipes to close) and its
+    own session / process group, so it survives the hook exiting. env
+    replaces the inherited environment when given.
+    """
+    import subprocess
+
+    kwargs: dict = {}
+    if IS_WINDOWS:
+        kwargs["creationflags"] = (
+            subprocess.CREATE_NO_WINDOW
+            | subprocess.CREATE_NEW_PROCESS_GROUP
+            | subprocess.DETACHED_PROCESS
+        )
+    else:
+        kwargs["start_new_session"] = True
+    return subprocess.Popen(
+        cmd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        stdin=subprocess.DEVNULL,
+        close_fds=True,
+        env=env,
+        **kwargs,
+    )
+
+
 def run_powershell(
     script: str,
     *,
@@ -70,7 +129,9 @@ def run_powershell(
     fire_and_forget: bool = False,
 ) -> subprocess.CompletedProcess[str] | None:
     """Run a PowerShell script hidden, returning a result unless detached."""
-    cmd = [POWERSHELL_EXE, "-WindowStyle", "Hidden", "-Command", script]
+    import subprocess
+
+    cmd = [get_powershell_exe(), "-WindowStyle", "Hidden", "-Command", script]
     kwargs = get_windows_subprocess_kwargs()
     if fire_and_forget:
         subprocess.Popen(
@@ -95,9 +156,11 @@ def run_powershell(
 def run_quiet(
     cmd: list[str],
     *,
-    timeout: int | None = None,
+    timeout: float | None = None,
 ) -> tuple[bool, str]:
     """Run a command quietly, returning (success, stripped_stdout)."""
+    import subprocess
+
     try:
         result = subprocess.run(
             cmd,
@@ -0,0 +1,86 @@
+"""
+Process ancestry helpers for terminal detection.
+
+Linux reads /proc/<pid>/stat directly (no subprocess). Other POSIX systems
+take a single `ps -A` snapshot of the process table and walk it in memory,
+instead of spawning one `ps` per ancestor.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from typing import Optional
+
+MAX_DEPTH = 16
+
+# Ancestry recorded by pin_ancestors(), for processes that may exit first.
+_pinned: dict[int, list[str]] = {}
+
+
+def _read_proc_entry(pid: int) -> Optional[tuple[int, str]]:
+    """Return (ppid, comm) for a Linux process from /proc/<pid>/stat."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as handle:
+            stat = handle.read().decode("utf-8", errors="replace")
+    except OSError:
+        return None
+    # Format: "pid (comm) state ppid ..."; comm itself may contain ") ".
+    head, _, tail = stat.rpartition(")")
+    comm = head.split("(", 1)[1] if "(" in head else ""
+    fields = tail.split()
+    if len(fields) < 2:
+        return None
+    return int(fields[1]), comm
+
+
+def _snapshot_ps() -> dict[int, tuple[int, str]]:
+    """Map pid -> (ppid, comm) from one `ps -A` call."""
+    table: dict[int, tuple[int, str]] = {}
+    try:
+        result = subprocess.run(
+            ["ps", "-A", "-o", "pid=,ppid=,comm="],
+            capture_output=True,
+            text=True,
+            timeout=1,
+            stdin=subprocess.DEVNULL,
+        )
+    except Exception:
+        return table
+    if result.returncode != 0:
+        return table
+    for line in result.stdout.splitlines():
+        parts = line.split(None, 2)
+        if len(parts) == 3 and parts[0].isdigit() and parts[1].isdigit():
+            table[int(parts[0])] = (int(parts[1]), parts[2])
+    return table
+
+
+def get_ancestor_names(pid: Optional[int] = None) -> list[str]:
+    """Lowercase process names from pid (default: this process) up to init."""
+    current = pid or os.getpid()
+    if current in _pinned:
+        return list(_pinned[current])
+    if sys.platform == "linux":
+        lookup = _read_proc_entry
+    else:
+        table = _snapshot_ps()
+        lookup = table.get
+
+    names: list[str] = []
+    seen = set()
+    while current > 1 and current not in seen and len(names) < MAX_DEPTH:
+        seen.add(current)
+        entry = lookup(current)
+        if entry is None:
+            break
+        parent, comm = entry
+        names.append(comm.strip().lower())
+        current = parent
+    return names
+
+
+def pin_ancestors(pid: int) -> None:
+    """Record pid's ancestry now, so later lookups still see it after pid exits."""
+    _pinned[pid] = get_ancestor_names(pid)
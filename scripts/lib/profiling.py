@@ -0,0 +1,80 @@
+"""
+Opt-in cProfile capture for hook invocations.
+
+Enabled with CLAUDE_HOOKS_PROFILE=1. The hook entry point then runs under
+cProfile and one .pstats file per invocation is written to hook_profiles/
+under the CLI home, named <hook>-<ms timestamp>-<pid>.pstats. The directory
+is bounded: after each write only the newest PROFILE_MAX_FILES are kept.
+scripts/hook_profile.py merges the most recent ones into a report.
+
+The switch is read when the entry point runs rather than at import, so the
+hook daemon's per-event children (which adopt the caller's environment)
+profile exactly the events that asked for it. With profiling off,
+run_profiled() is a plain call and cProfile is never imported.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from .platform_runtime import CLI_HOME
+
+PROFILE_DIR = CLI_HOME / "hook_profiles"
+PROFILE_MAX_FILES = 200
+
+_ENV_NAME = "CLAUDE_HOOKS_PROFILE"
+
+
+def profiling_enabled() -> bool:
+    return os.environ.get(_ENV_NAME, "").lower() in ("1", "true", "yes")
+
+
+def run_profiled(hook: str, func: Callable[[], Any]) -> Any:
+    """Call func(), under cProfile when CLAUDE_HOOKS_PROFILE is set."""
+    if not profiling_enabled():
+        return func()
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        return func()
+    finally:
+        profiler.disable()
+        _save(profiler, hook)
+
+
+def _save(profiler: Any, hook: str) -> None:
+    """Dump the profile and prune the directory. Never raises."""
+    try:
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        stamp = int(time.time() * 1000)
+        profiler.dump_stats(str(PROFILE_DIR / f"{hook}-{stamp}-{os.getpid()}.pstats"))
+        _prune()
+    except Exception:
+        pass
+
+
+def _prune() -> None:
+    for path in list_profiles()[PROFILE_MAX_FILES:]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def list_profiles(hook: str | None = None) -> list[Path]:
+    """Saved profiles, newest first; only one hook's when hook is given."""
+    pattern = f"{hook}-*.pstats" if hook else "*.pstats"
+    entries = []
+    for path in PROFILE_DIR.glob(pattern):
+        try:
+            entries.append((path.stat().st_mtime, path))
+        except OSError:
+            pass
+    entries.sort(reverse=True)
+    return [path for _, path in entries]
@@ -0,0 +1,143 @@
+"""
+Per-key token-bucket rate limiting for hook notifications.
+
+Each key (a project directory or a session id, per event type) gets its own
+bucket, so one noisy project cannot starve the others. All buckets live in
+one fixed-size binary file under the CLI home: BUCKET_SLOTS records of
+(key, tokens, updated). Updates take the file lock and replace the file
+atomically; readers such as scripts/rate_limits.py never see a partial write.
+
+Limits are "burst/seconds" per event type: a bucket holds up to `burst`
+tokens and refills `burst` tokens every `seconds`. Override one with
+CLAUDE_HOOKS_RATE_LIMIT_<EVENT>, e.g. CLAUDE_HOOKS_RATE_LIMIT_STOP=10/60,
+or disable it with "off". A malformed override (not two finite, positive
+numbers) falls back to the default limit.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+import struct
+import time
+from typing import NamedTuple, Optional
+
+from .file_lock import locked, write_atomic
+from .platform_runtime import CLI_HOME
+
+BUCKETS_PATH = CLI_HOME / ".rate_buckets.bin"
+BUCKETS_LOCK_PATH = CLI_HOME / ".rate_buckets.lock"
+
+DEFAULT_RATE_LIMITS = {
+    "stop": (6, 60.0),
+    "agent-turn-complete": (6, 60.0),
+}
+FALLBACK_RATE_LIMIT = (6, 60.0)
+
+BUCKET_SLOTS = 64
+_MAGIC = b"RLB1"
+_SLOT = struct.Struct("<48sdd")
+_FILE_SIZE = len(_MAGIC) + BUCKET_SLOTS * _SLOT.size
+
+
+class Bucket(NamedTuple):
+    key: str
+    tokens: float
+    updated: float
+
+
+def get_rate_limit(event_type: str) -> Optional[tuple[float, float]]:
+    """(burst, seconds) for an event type, or None when limiting is off."""
+    env_name = "CLAUDE_HOOKS_RATE_LIMIT_" + re.sub(r"\W", "_", event_type).upper()
+    override = os.environ.get(env_name, "").strip().lower()
+    if override in ("off", "0", "none"):
+        return None
+    if override:
+        try:
+            burst, seconds = (float(part) for part in override.split("/", 1))
+        except ValueError:
+            burst = seconds = 0.0
+        if all(math.isfinite(v) and v > 0 for v in (burst, seconds)):
+            return burst, seconds
+    return DEFAULT_RATE_LIMITS.get(event_type, FALLBACK_RATE_LIMIT)
+
+
+def read_buckets() -> list[Bucket]:
+    """All occupied bucket slots, as last written."""
+    try:
+        with open(BUCKETS_PATH, "rb") as handle:
+            data = handle.read()
+    except OSError:
+        return []
+    if len(data) != _FILE_SIZE or not data.startswith(_MAGIC):
+        return []
+
+    buckets = []
+    for index in range(BUCKET_SLOTS):
+        raw_key, tokens, updated = _SLOT.unpack_from(
+            data, len(_MAGIC) + index * _SLOT.size
+        )
+        key = raw_key.rstrip(b"\0").decode("utf-8", errors="replace")
+        if key:
+            buckets.append(Bucket(key, tokens, updated))
+    return buckets
+
+
+def _write_buckets(buckets: list[Bucket]) -> None:
+    payload = bytearray(_MAGIC)
+    for bucket in buckets[:BUCKET_SLOTS]:
+        payload += _SLOT.pack(
+            bucket.key.encode("utf-8")[: _SLOT.size - 16], bucket.tokens, bucket.updated
+        )
+    payload += b"\0" * (_FILE_SIZE - len(payload))
+    write_atomic(BUCKETS_PATH, bytes(payload))
+
+
+def bucket_key(event_type: str, key: str) -> str:
+    """Slot key; long keys keep their tail (the project directory name)."""
+    full = f"{event_type}:{key}"
+    encoded = full.encode("utf-8")
+    if len(encoded) <= _SLOT.size - 16:
+        return full
+    return "…" + encoded[-(_SLOT.size - 16 - 3) :].decode("utf-8", errors="ignore")
+
+
+def refill(bucket: Bucket, limit: tuple[float, float], now: float) -> float:
+    """Token level of a bucket at time `now`."""
+    burst, seconds = limit
+    elapsed = max(now - bucket.updated, 0.0)
+    return min(burst, bucket.tokens + elapsed * burst / seconds)
+
+
+def allow(event_type: str, key: str) -> bool:
+    """Take one token from the (event_type, key) bucket; False when it is empty.
+
+    Fails open: if the state file cannot be locked or written, the event is
+    allowed rather than silently suppressed.
+    """
+    limit = get_rate_limit(event_type)
+    if limit is None:
+        return True
+
+    slot_key = bucket_key(event_type, key)
+    with locked(BUCKETS_LOCK_PATH) as ok:
+        if not ok:
+            return True
+        now = time.time()
+        buckets = read_buckets()
+        current = next((b for b in buckets if b.key == slot_key), None)
+        others = [b for b in buckets if b.key != slot_key]
+
+        tokens = refill(current, limit, now) if current else float(limit[0])
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+
+        # Most recently used first; the least recently used slot falls off.
+        others.sort(key=lambda b: b.updated, reverse=True)
+        try:
+            _write_buckets([Bucket(slot_key, tokens, now)] + others)
+        except OSError:
+            return True
+        return allowed
@@ -0,0 +1,97 @@
+"""
+Per-session notification context recorded at SessionStart.
+
+The hosting terminal and the project identity do not change during a session,
+so hooks/session-start.py resolves them once and the Stop hook reads them back
+by session_id instead of walking the process tree on every turn.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Optional
+
+from .platform_runtime import CLI_HOME
+
+SESSION_DIR = CLI_HOME / "sessions"
+# Past this age a record is recomputed on use (a resumed session may run in a
+# different terminal); past the sweep age it is deleted outright.
+SESSION_STALE_SECONDS = 24 * 3600
+SESSION_SWEEP_SECONDS = 7 * 24 * 3600
+
+_UNSAFE_ID_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def _record_path(session_id: str) -> Optional[Path]:
+    safe_id = _UNSAFE_ID_CHARS.sub("", session_id or "")[:128].lstrip(".")
+    return SESSION_DIR / f"{safe_id}.json" if safe_id else None
+
+
+def write_session_record(
+    session_id: str,
+    cwd: str,
+    terminal: tuple[str, str, str],
+    project: tuple[str, str],
+) -> None:
+    """Atomically store the resolved context for a session."""
+    path = _record_path(session_id)
+    if path is None:
+        return
+    record = {
+        "cwd": cwd,
+        "terminal": list(terminal),
+        "project": list(project),
+        "created": time.time(),
+    }
+    try:
+        SESSION_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(record, handle, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception:
+        pass
+
+
+def read_session_record(session_id: Optional[str], cwd: str) -> Optional[dict]:
+    """Return the session's record, or None if it is missing, stale or for another cwd.
+
+    The returned dict carries "terminal" and "project" as tuples, ready to be
+    used in place of get_terminal_app() and get_project_name(cwd).
+    """
+    path = _record_path(session_id or "")
+    if path is None:
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            record = json.load(handle)
+        if record.get("cwd") != cwd:
+            return None
+        if time.time() - float(record.get("created", 0)) > SESSION_STALE_SECONDS:
+            return None
+        terminal = tuple(str(value) for value in record["terminal"])
+        project = tuple(str(value) for value in record["project"])
+        if len(terminal) != 3 or len(project) != 2:
+            return None
+        return {"terminal": terminal, "project": project}
+    except Exception:
+        return None
+
+
+def sweep_session_records() -> None:
+    """Delete records (and orphaned temp files) older than the sweep age."""
+    cutoff = time.time() - SESSION_SWEEP_SECONDS
+    try:
+        entries = list(SESSION_DIR.iterdir())
+    except OSError:
+        return
+    for path in entries:
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
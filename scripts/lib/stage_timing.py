@@ -0,0 +1,263 @@
+"""
+Persistent per-stage latency histograms for the hooks.
+
+Each hook process times its stages (stdin parse, summary, terminal
+detection, delivery, ...) with span()/timed()/record(), keeps the samples in
+memory, and merges them at exit into one fixed-size binary file under the
+CLI home: HISTOGRAM_SLOTS records of (hook:stage key, last update, count,
+timeouts, fallbacks, max, log-spaced bucket counts). The merge takes the file
+lock and replaces the file atomically, like the rate-limit buckets, so
+scripts/hook_stats.py can read it at any time.
+
+Buckets are log-spaced (BUCKETS_PER_DOUBLING per factor of two from
+MIN_BUCKET_MS), so percentiles are accurate to about ±13% over 10µs–25s.
+Recording is on by default and costs one small locked file rewrite per
+process; set CLAUDE_HOOKS_STATS=0 to turn it off.
+"""
+
+from __future__ import annotations
+
+import atexit
+import math
+import os
+import struct
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, NamedTuple, Optional
+
+from .debug_log import log_event
+from .file_lock import locked, write_atomic
+from .platform_runtime import CLI_HOME
+
+
+def stats_enabled() -> bool:
+    # Not cached: events forwarded to the daemon carry their own setting.
+    return os.environ.get("CLAUDE_HOOKS_STATS", "").lower() not in ("0", "false", "no", "off")
+
+
+HISTOGRAM_PATH = CLI_HOME / ".hook_stats.bin"
+HISTOGRAM_LOCK_PATH = CLI_HOME / ".hook_stats.lock"
+
+HISTOGRAM_SLOTS = 48
+BUCKET_COUNT = 64
+BUCKETS_PER_DOUBLING = 3
+MIN_BUCKET_MS = 0.01
+
+_MAGIC = b"HST1"
+_SLOT = struct.Struct(f"<40sdIIId{BUCKET_COUNT}I")
+_FILE_SIZE = len(_MAGIC) + HISTOGRAM_SLOTS * _SLOT.size
+_KEY_BYTES = 40
+
+
+class Histogram(NamedTuple):
+    key: str
+    updated: float
+    count: int
+    timeouts: int
+    fallbacks: int
+    max_ms: float
+    buckets: tuple[int, ...]
+
+    @property
+    def hook(self) -> str:
+        return self.key.split(":", 1)[0]
+
+    @property
+    def stage(self) -> str:
+        return self.key.split(":", 1)[-1]
+
+
+# This process's unmerged samples: key -> [durations_ms, timeouts, fallbacks]
+_pending: dict[str, list] = {}
+_hook_name = "hook"
+_atexit_registered = False
+
+
+def set_hook(name: str) -> None:
+    """Name the hook this process runs; it prefixes every recorded stage."""
+    global _hook_name
+    _hook_name = name
+
+
+def _entry(stage: str) -> list:
+    global _atexit_registered
+    if not _atexit_registered:
+        atexit.register(flush)
+        _atexit_registered = True
+    return _pending.setdefault(f"{_hook_name}:{stage}", [[], 0, 0])
+
+
+def record(
+    stage: str,
+    ms: Optional[float] = None,
+    *,
+    timeout: bool = False,
+    fallback: bool = False,
+) -> None:
+    """Record a stage duration and/or count a timeout or fallback for it."""
+    if not stats_enabled():
+        return
+    entry = _entry(stage)
+    if ms is not None:
+        entry[0].append(ms)
+    if timeout:
+        entry[1] += 1
+    if fallback:
+        entry[2] += 1
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time the block into the stage histogram (and the debug log)."""
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        ms = (time.monotonic() - start) * 1000
+        record(stage, ms)
+        log_event("span", stage=stage, ms=round(ms, 2))
+
+
+def timed(stage: str, func: Callable[[], Any]) -> Callable[[], Any]:
+    """Wrap a zero-argument callable so each call is timed as a stage."""
+
+    def _timed() -> Any:
+        with span(stage):
+            return func()
+
+    return _timed
+
+
+def bucket_index(ms: float) -> int:
+    if ms <= MIN_BUCKET_MS:
+        return 0
+    index = int(math.log2(ms / MIN_BUCKET_MS) * BUCKETS_PER_DOUBLING) + 1
+    return min(index, BUCKET_COUNT - 1)
+
+
+def bucket_bounds(index: int) -> tuple[float, float]:
+    """(low, high) milliseconds covered by a bucket."""
+    if index == 0:
+        return 0.0, MIN_BUCKET_MS
+    low = MIN_BUCKET_MS * 2 ** ((index - 1) / BUCKETS_PER_DOUBLING)
+    high = MIN_BUCKET_MS * 2 ** (index / BUCKETS_PER_DOUBLING)
+    return low, high
+
+
+def percentile(histogram: Histogram, fraction: float) -> float:
+    """Approximate percentile in ms: the geometric middle of the bucket that
+    holds it, capped at the recorded maximum."""
+    total = sum(histogram.buckets)
+    if not total:
+        return 0.0
+    rank = fraction * total
+    seen = 0
+    for index, count in enumerate(histogram.buckets):
+        seen += count
+        if seen >= rank and count:
+            low, high = bucket_bounds(index)
+            middle = math.sqrt(low * high) if low else high / 2
+            return min(middle, histogram.max_ms)
+    return histogram.max_ms
+
+
+def read_histograms() -> list[Histogram]:
+    """All occupied histogram slots, as last merged."""
+    try:
+        with open(HISTOGRAM_PATH, "rb") as handle:
+            data = handle.read()
+    except OSError:
+        return []
+    if len(data) != _FILE_SIZE or not data.startswith(_MAGIC):
+        return []
+
+    histograms = []
+    for index in range(HISTOGRAM_SLOTS):
+        raw_key, updated, count, timeouts, fallbacks, max_ms, *buckets = (
+            _SLOT.unpack_from(data, len(_MAGIC) + index * _SLOT.size)
+        )
+        key = raw_key.rstrip(b"\0").decode("utf-8", errors="replace")
+        if key:
+            histograms.append(
+                Histogram(key, updated, count, timeouts, fallbacks, max_ms, tuple(buckets))
+            )
+    return histograms
+
+
+def _write_histograms(histograms: list[Histogram]) -> None:
+    payload = bytearray(_MAGIC)
+    for histogram in histograms[:HISTOGRAM_SLOTS]:
+        payload += _SLOT.pack(
+            histogram.key.encode("utf-8")[:_KEY_BYTES],
+            histogram.updated,
+            histogram.count,
+            histogram.timeouts,
+            histogram.fallbacks,
+            histogram.max_ms,
+            *histogram.buckets,
+        )
+    payload += b"\0" * (_FILE_SIZE - len(payload))
+    write_atomic(HISTOGRAM_PATH, bytes(payload))
+
+
+def _merge(
+    histogram: Optional[Histogram],
+    key: str,
+    samples: list[float],
+    timeouts: int,
+    fallbacks: int,
+    now: float,
+) -> Histogram:
+    buckets = list(histogram.buckets) if histogram else [0] * BUCKET_COUNT
+    for ms in samples:
+        buckets[bucket_index(ms)] += 1
+    return Histogram(
+        key,
+        now,
+        (histogram.count if histogram else 0) + len(samples),
+        (histogram.timeouts if histogram else 0) + timeouts,
+        (histogram.fallbacks if histogram else 0) + fallbacks,
+        max([histogram.max_ms if histogram else 0.0, *samples]),
+        tuple(min(count, 0xFFFFFFFF) for count in buckets),
+    )
+
+
+def flush() -> None:
+    """Merge this process's samples into the histogram file. Never raises;
+    samples are dropped if the lock cannot be taken quickly."""
+    if not _pending:
+        return
+    pending = dict(_pending)
+    _pending.clear()
+    try:
+        with locked(HISTOGRAM_LOCK_PATH, timeout=0.5) as ok:
+            if not ok:
+                return
+            now = time.time()
+            by_key = {h.key: h for h in read_histograms()}
+            for key, (samples, timeouts, fallbacks) in pending.items():
+                by_key[key] = _merge(by_key.get(key), key, samples, timeouts, fallbacks, now)
+            # Most recently updated first; the stalest slot falls off.
+            ordered = sorted(by_key.values(), key=lambda h: h.updated, reverse=True)
+            _write_histograms(ordered)
+    except Exception:
+        pass
+
+
+def reset() -> None:
+    """Delete all recorded histograms."""
+    with locked(HISTOGRAM_LOCK_PATH) as ok:
+        if ok:
+            try:
+                os.remove(HISTOGRAM_PATH)
+            except FileNotFoundError:
+                pass
+
+
+def _reset_after_fork() -> None:
+    # Forked daemon children start with an empty sample buffer.
+    _pending.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,253 @@
+"""
+Budgeted digest of the project state files for hooks/session-start.py.
+
+SessionStart prints .state/state.json and .state/handoffs.json into the new
+session's context. In long-lived repos the backlog, shipped list and
+archived handoffs grow without bound, and every session pays for them. When
+the two files together exceed the budget (CLAUDE_HOOKS_STATE_BUDGET bytes,
+or CLAUDE_HOOKS_STATE_BUDGET_TOKENS at ~4 bytes per token; "off" prints
+them verbatim), a digest is printed instead. It always keeps currentFocus,
+lastSession and each active handoff with its current phase, then the top
+backlog items as the budget allows (at most CLAUDE_HOOKS_STATE_BACKLOG).
+Everything else is summarised as counts, e.g. "37 more backlog items".
+
+Parsing is tolerant and bounded: at most MAX_READ_BYTES are read, and a
+file that is truncated or malformed is decoded one top-level key at a time
+under PARSE_DEADLINE_SECONDS, keeping whatever parsed before the damage.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+DEFAULT_BUDGET_BYTES = 8 * 1024
+BYTES_PER_TOKEN = 4
+DEFAULT_BACKLOG_ITEMS = 5
+MAX_READ_BYTES = 4 * 1024 * 1024
+PARSE_DEADLINE_SECONDS = 1.0
+MAX_STRING_CHARS = 300
+
+# state.json keys printed whole, whatever their size
+ALWAYS_KEYS = ("currentFocus", "lastSession")
+
+_WHITESPACE = " \t\r\n"
+
+
+def state_budget() -> Optional[int]:
+    """Digest budget in bytes, or None when digests are turned off."""
+    raw = os.environ.get("CLAUDE_HOOKS_STATE_BUDGET", "").strip().lower()
+    if raw in ("off", "0", "none", "full"):
+        return None
+    tokens = os.environ.get("CLAUDE_HOOKS_STATE_BUDGET_TOKENS", "").strip()
+    try:
+        if tokens:
+            return max(int(tokens), 1) * BYTES_PER_TOKEN
+        if raw:
+            return max(int(raw), 1)
+    except ValueError:
+        pass
+    return DEFAULT_BUDGET_BYTES
+
+
+def _backlog_limit() -> int:
+    try:
+        return max(int(os.environ.get("CLAUDE_HOOKS_STATE_BACKLOG", "")), 0)
+    except ValueError:
+        return DEFAULT_BACKLOG_ITEMS
+
+
+def load_json_tolerant(path: Path) -> tuple[Optional[dict], bool]:
+    """(top-level object, parsed completely) for a JSON file.
+
+    A file that is too large or malformed yields the top-level keys that
+    decoded before the damage (or None when not even the opening brace did).
+    """
+    try:
+        with open(path, "rb") as handle:
+            data = handle.read(MAX_READ_BYTES + 1)
+    except OSError:
+        return None, False
+    text = data[:MAX_READ_BYTES].decode("utf-8", errors="replace")
+    if len(data) <= MAX_READ_BYTES:
+        try:
+            value = json.loads(text)
+            return (value, True) if isinstance(value, dict) else (None, False)
+        except ValueError:
+            pass
+    return _decode_prefix(text), False
+
+
+def _decode_prefix(text: str) -> Optional[dict]:
+    """Decode a top-level object key by key until the first broken value."""
+    decoder = json.JSONDecoder()
+    deadline = time.monotonic() + PARSE_DEADLINE_SECONDS
+    index = len(text) - len(text.lstrip(_WHITESPACE + "\ufeff"))
+    if not text.startswith("{", index):
+        return None
+    index += 1
+    result: dict = {}
+    while time.monotonic() < deadline:
+        while index < len(text) and text[index] in _WHITESPACE + ",":
+            index += 1
+        if index >= len(text) or text[index] == "}":
+            break
+        try:
+            key, index = decoder.raw_decode(text, index)
+            while index < len(text) and text[index] in _WHITESPACE:
+                index += 1
+            if not isinstance(key, str) or text[index : index + 1] != ":":
+                break
+            index += 1
+            while index < len(text) and text[index] in _WHITESPACE:
+                index += 1
+            value, index = decoder.raw_decode(text, index)
+        except ValueError:
+            break
+        result[key] = value
+    return result
+
+
+def _shorten(value: Any) -> Any:
+    """Cap long strings inside an optional item."""
+    if isinstance(value, str) and len(value) > MAX_STRING_CHARS:
+        return value[: MAX_STRING_CHARS - 1] + "…"
+    if isinstance(value, list):
+        return [_shorten(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _shorten(item) for key, item in value.items()}
+    return value
+
+
+def _count_label(key: str, value: Any, noun: str = "items") -> str:
+    if isinstance(value, list):
+        return f"{len(value)} {key} {noun}"
+    if isinstance(value, dict):
+        return f"{len(value)} {key} entries"
+    return f"{key} (long {type(value).__name__})"
+
+
+def digest_state(state: dict, backlog_items: int) -> dict:
+    """currentFocus, lastSession, small scalars and the top backlog items;
+    everything else as counts under "omitted"."""
+    digest: dict = {}
+    omitted: list[str] = []
+    for key, value in state.items():
+        if key in ALWAYS_KEYS:
+            digest[key] = value
+        elif key == "backlog" and isinstance(value, list):
+            digest[key] = [_shorten(item) for item in value[:backlog_items]]
+            if len(value) > backlog_items:
+                omitted.append(f"{len(value) - backlog_items} more backlog items")
+        elif isinstance(value, (str, int, float, bool)) or value is None:
+            if len(str(value)) <= MAX_STRING_CHARS:
+                digest[key] = value
+            else:
+                omitted.append(_count_label(key, value))
+        elif value:
+            omitted.append(_count_label(key, value))
+    if omitted:
+        digest["omitted"] = omitted
+    return digest
+
+
+def _current_phase(handoff: dict) -> Any:
+    phases = handoff.get("phases")
+    if not isinstance(phases, list) or not phases:
+        return None
+    current = handoff.get("currentPhase")
+    if isinstance(current, int) and 1 <= current <= len(phases):
+        return phases[current - 1]
+    for phase in phases:
+        if isinstance(phase, dict) and phase.get("status") != "complete":
+            return phase
+    return phases[-1]
+
+
+def digest_handoffs(handoffs: dict) -> dict:
+    """Each active handoff with its current phase; archived ones as a count."""
+    active = []
+    for handoff in handoffs.get("active") or []:
+        if not isinstance(handoff, dict):
+            continue
+        entry = {
+            key: handoff[key]
+            for key in ("id", "title", "file", "currentPhase", "lastTouched")
+            if key in handoff
+        }
+        phases = handoff.get("phases")
+        if isinstance(phases, list):
+            done = sum(1 for p in phases if isinstance(p, dict) and p.get("status") == "complete")
+            entry["progress"] = f"{done}/{len(phases)} phases complete"
+        phase = _current_phase(handoff)
+        if phase is not None:
+            entry["phase"] = phase
+        active.append(entry)
+
+    digest: dict = {"active": active}
+    omitted = [
+        _count_label(key, value, "handoffs")
+        for key, value in handoffs.items()
+        if key != "active" and value
+    ]
+    if omitted:
+        digest["omitted"] = omitted
+    return digest
+
+
+def _section(title: str, value: Any) -> str:
+    return f"=== {title} ===\n{json.dumps(value, indent=2, ensure_ascii=False)}\n"
+
+
+def _unparsed(path: Path) -> dict:
+    return {"note": f"{path.as_posix()} could not be parsed; read it directly if needed."}
+
+
+def render_digest(state_path: Path, handoffs_path: Path) -> Optional[str]:
+    """Digest text for SessionStart, or None when the files should be printed
+    verbatim (digests off, no state file, or both files within the budget)."""
+    budget = state_budget()
+    if budget is None:
+        return None
+    try:
+        state_size = state_path.stat().st_size
+    except OSError:
+        return None
+    try:
+        handoffs_size = handoffs_path.stat().st_size
+    except OSError:
+        handoffs_size = None
+    if state_size + (handoffs_size or 0) <= budget:
+        return None
+
+    handoffs_text = ""
+    if handoffs_size is not None:
+        handoffs, _ = load_json_tolerant(handoffs_path)
+        handoffs_text = _section(
+            f"{handoffs_path.as_posix()} (digest)",
+            digest_handoffs(handoffs) if handoffs is not None else _unparsed(handoffs_path),
+        )
+
+    state, complete = load_json_tolerant(state_path)
+    note = (
+        f"Digest of {state_path.as_posix()} ({state_size} bytes); read the file for the full "
+        "backlog and history."
+    )
+    if not complete:
+        note += " The file is large or malformed; only its readable keys are shown."
+    if state is None:
+        state_text = _section(state_path.as_posix(), _unparsed(state_path))
+    else:
+        # Fill what the budget allows with backlog items; the always-kept
+        # keys and active handoffs are printed even if they alone exceed it.
+        for items in range(_backlog_limit(), -1, -1):
+            state_text = _section(
+                f"{state_path.as_posix()} (digest)",
+                {"note": note, **digest_state(state, items)},
+            )
+            if len((state_text + handoffs_text).encode("utf-8")) <= budget:
+                break
+    return state_text + handoffs_text
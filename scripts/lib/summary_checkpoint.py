@@ -0,0 +1,103 @@
+"""
+Per-transcript checkpoints for incremental task summaries.
+
+A checkpoint remembers how far into a transcript the last summary scan got
+(byte offset of the last complete line), the file identity at that point and
+the summary it found, so the next Stop event only parses what was appended.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from typing import NamedTuple, Optional
+
+from .platform_runtime import CLI_HOME
+
+CHECKPOINT_DIR = CLI_HOME / "summary-checkpoints"
+CHECKPOINT_MAX_AGE_SECONDS = 7 * 24 * 3600
+CHECKPOINT_MAX_COUNT = 200
+# A write takes milliseconds; a temp file this old was left by a process
+# that died mid-write.
+CHECKPOINT_TMP_MAX_AGE_SECONDS = 3600
+
+
+class Checkpoint(NamedTuple):
+    offset: int
+    size: int
+    mtime_ns: int
+    dev: int
+    ino: int
+    summary: Optional[str]
+
+
+def _checkpoint_path(transcript_path: str):
+    digest = hashlib.sha1(os.path.abspath(transcript_path).encode("utf-8"))
+    return CHECKPOINT_DIR / f"{digest.hexdigest()[:20]}.json"
+
+
+def load_checkpoint(transcript_path: str, stat: os.stat_result) -> Optional[Checkpoint]:
+    """Return the stored checkpoint if it still describes this transcript.
+
+    A checkpoint is discarded when the file was replaced (different device or
+    inode) or truncated below the recorded offset.
+    """
+    try:
+        with open(_checkpoint_path(transcript_path), "r", encoding="utf-8") as handle:
+            checkpoint = Checkpoint(**json.load(handle))
+    except Exception:
+        return None
+
+    if (checkpoint.dev, checkpoint.ino) != (stat.st_dev, stat.st_ino):
+        return None
+    if stat.st_size < checkpoint.offset or stat.st_size < checkpoint.size:
+        return None
+    return checkpoint
+
+
+def save_checkpoint(transcript_path: str, checkpoint: Checkpoint) -> None:
+    """Atomically write a checkpoint, evicting old ones when a new file is added."""
+    path = _checkpoint_path(transcript_path)
+    try:
+        is_new = not path.exists()
+        CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(checkpoint._asdict(), handle)
+        os.replace(tmp_path, path)
+        if is_new:
+            evict_checkpoints()
+    except Exception:
+        pass
+
+
+def evict_checkpoints() -> None:
+    """Drop checkpoints older than the max age, then the oldest beyond the max
+    count, along with temp files orphaned by interrupted writes."""
+    now = time.time()
+    for path in CHECKPOINT_DIR.glob("*.tmp"):
+        try:
+            if now - path.stat().st_mtime > CHECKPOINT_TMP_MAX_AGE_SECONDS:
+                path.unlink()
+        except OSError:
+            pass
+
+    entries = []
+    for path in CHECKPOINT_DIR.glob("*.json"):
+        try:
+            mtime = path.stat().st_mtime
+            if now - mtime > CHECKPOINT_MAX_AGE_SECONDS:
+                path.unlink()
+            else:
+                entries.append((mtime, path))
+        except OSError:
+            pass
+
+    entries.sort(reverse=True)
+    for _mtime, path in entries[CHECKPOINT_MAX_COUNT:]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
@@ -3,74 +3,176 @@ Task summary extraction helpers for completion notifications.
 """
 
 import json
+import os
+from itertools import islice
+from typing import Optional
 
 from .message_cleanup import (
     clean_message_for_notification,
     detect_action_emoji,
     find_content_line,
+    leading_lines,
     should_skip_line,
 )
-from .platform_runtime import log_debug
-from .transcript_io import read_last_lines
+from .debug_log import log_event
+from .summary_checkpoint import Checkpoint, load_checkpoint, save_checkpoint
+from .transcript_io import decode_line, iter_lines_reverse
 
 
-def get_task_summary(transcript_path: str, debug_log_path=None) -> str:
-    """Extract a one-line summary from the last assistant text message."""
+# How far back the adaptive mode may walk before giving up on finding an
+# assistant text block (long tool-only stretches at the end of a turn).
+ADAPTIVE_SCAN_BYTES = 16 * 1024 * 1024
+
+# Only the head of an assistant message feeds the summary; this many
+# non-empty lines is plenty to get past acknowledgments and headings.
+SUMMARY_SCAN_LINES = 8
+
+# Compact (Claude Code) and spaced JSON spellings of the markers every
+# assistant text entry carries. Inside JSON string values quotes are escaped,
+# so these byte sequences can only come from the entry's own structure.
+_ROLE_MARKERS = (b'"role":"assistant"', b'"role": "assistant"')
+_TEXT_MARKERS = (b'"type":"text"', b'"type": "text"')
+
+
+def _may_be_assistant_text(raw: bytes) -> bool:
+    """Cheap byte-level check run before json.loads on a transcript line."""
+    return any(marker in raw for marker in _ROLE_MARKERS) and any(
+        marker in raw for marker in _TEXT_MARKERS
+    )
+
+
+def _summarize_entry(raw: bytes) -> Optional[str]:
+    """Return a notification summary for an assistant text entry, else None."""
+    if not _may_be_assistant_text(raw):
+        return None
+
+    try:
+        entry = json.loads(decode_line(raw))
+    except json.JSONDecodeError:
+        return None
+
+    message = entry.get("message", {})
+    if message.get("role") != "assistant":
+        return None
+
+    content = message.get("content", [])
+    if not isinstance(content, list):
+        return None
+
+    for block in content:
+        if not isinstance(block, dict) or block.get("type") != "text":
+            continue
+
+        text = block.get("text", "")
+        if not isinstance(text, str):
+            continue
+
+        text_lines = leading_lines(text, SUMMARY_SCAN_LINES)
+        if not text_lines:
+            continue
+
+        first_line = text_lines[0]
+        next_line_index = 1
+
+        if len(text_lines) > 1 and should_skip_line(first_line):
+            content_line, next_line_index = find_content_line(text_lines, 1)
+            if content_line:
+                first_line = content_line
+            elif len(text_lines) > 1:
+                first_line = text_lines[1]
+
+        if len(first_line) < 15 and next_line_index < len(text_lines):
+            second_line, _ = find_content_line(text_lines, next_line_index)
+            if second_line:
+                first_line = f"{first_line} {second_line}"
+
+        cleaned = clean_message_for_notification(first_line)
+        emoji = detect_action_emoji(cleaned)
+        return f"{emoji} {cleaned}" if emoji else cleaned
+
+    return None
+
+
+def _scan_appended(transcript_path: str) -> Optional[str]:
+    """Summarize only what was appended since the transcript's last checkpoint.
+
+    Falls back to the checkpointed summary when the new region holds no
+    assistant text, and records a fresh checkpoint at the last complete line.
+    """
+    stat = os.stat(transcript_path)
+    checkpoint = load_checkpoint(transcript_path, stat)
+    if (
+        checkpoint
+        and checkpoint.size == stat.st_size
+        and checkpoint.mtime_ns == stat.st_mtime_ns
+    ):
+        return checkpoint.summary
+
+    start = checkpoint.offset if checkpoint else 0
+    start = max(start, stat.st_size - ADAPTIVE_SCAN_BYTES)
+
+    summary = None
+    offset = stat.st_size
+    for index, raw in enumerate(
+        iter_lines_reverse(transcript_path, start=start, end=stat.st_size)
+    ):
+        if index == 0 and not raw.endswith(b"\n"):
+            # Still being written: rescan it next time.
+            offset -= len(raw)
+        summary = _summarize_entry(raw)
+        if summary:
+            break
+
+    if summary is None and checkpoint:
+        summary = checkpoint.summary
+
+    save_checkpoint(
+        transcript_path,
+        Checkpoint(
+            offset=offset,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            dev=stat.st_dev,
+            ino=stat.st_ino,
+            summary=summary,
+        ),
+    )
+    return summary
+
+
+def get_task_summary(
+    transcript_path: str,
+    debug_log_path=None,
+    *,
+    adaptive: bool = False,
+    incremental: bool = False,
+) -> str:
+    """Extract a one-line summary from the last assistant text message.
+
+    By default only the last 50 lines are considered. With adaptive=True the
+    transcript is walked backwards line by line (up to ADAPTIVE_SCAN_BYTES)
+    until an assistant text block turns up, so a turn that ends in a long run
+    of tool results still gets a real summary. incremental=True does the same
+    walk but stops at the per-transcript checkpoint left by the previous call,
+    so only newly appended bytes are parsed.
+
+    debug_log_path is ignored (errors go to the structured debug log); it is
+    kept so existing callers don't break.
+    """
     try:
-        lines = read_last_lines(transcript_path, 50)
-        if not lines:
-            return "Task completed"
-
-        for line in reversed(lines):
-            if not line.strip():
-                continue
-
-            try:
-                entry = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-
-            message = entry.get("message", {})
-            if message.get("role") != "assistant":
-                continue
-
-            content = message.get("content", [])
-            if not isinstance(content, list):
-                continue
-
-            for block in content:
-                if not isinstance(block, dict) or block.get("type") != "text":
-                    continue
-
-                text = block.get("text", "").strip()
-                if not text:
-                    continue
-
-                text_lines = [
-                    entry.strip() for entry in text.split("\n") if entry.strip()
-                ]
-                if not text_lines:
-                    continue
-
-                first_line = text_lines[0]
-                next_line_index = 1
-
-                if len(text_lines) > 1 and should_skip_line(first_line):
-                    content_line, next_line_index = find_content_line(text_lines, 1)
-                    if content_line:
-                        first_line = content_line
-                    elif len(text_lines) > 1:
-                        first_line = text_lines[1]
-
-                if len(first_line) < 15 and next_line_index < len(text_lines):
-                    second_line, _ = find_content_line(text_lines, next_line_index)
-                    if second_line:
-                        first_line = f"{first_line} {second_line}"
-
-                cleaned = clean_message_for_notification(first_line)
-                emoji = detect_action_emoji(cleaned)
-                return f"{emoji} {cleaned}" if emoji else cleaned
+        if incremental:
+            return _scan_appended(transcript_path) or "Task completed"
+
+        if adaptive:
+            lines = iter_lines_reverse(transcript_path, max_bytes=ADAPTIVE_SCAN_BYTES)
+        else:
+            lines = islice(iter_lines_reverse(transcript_path), 50)
+
+        for raw in lines:
+            summary = _summarize_entry(raw)
+            if summary:
+                return summary
     except Exception as exc:
-        log_debug(f"  → Exception in get_task_summary: {exc}", path=debug_log_path)
+        log_event("summary.error", error=exc)
 
     return "Task completed"
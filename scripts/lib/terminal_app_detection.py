@@ -5,15 +5,10 @@ Terminal app detection helpers for notifications.
 from __future__ import annotations
 
 import os
-import subprocess
 from typing import Optional
 
 from .platform_runtime import IS_MACOS, IS_WINDOWS, IS_WSL
-
-if IS_WINDOWS:
-    import ctypes
-    import ctypes.wintypes
-
+from .process_tree import get_ancestor_names
 
 MACOS_APP_INFO = {
     "antigravity": ("Antigravity", "🚀", "Antigravity"),
@@ -29,6 +24,26 @@ MACOS_APP_INFO = {
     "terminal": ("Terminal", "🖥️", "Terminal"),
 }
 
+# Keyed by the exact /proc comm name (truncated to 15 characters by the kernel).
+LINUX_APP_INFO = {
+    "gnome-terminal-": ("GNOME Terminal", "🖥️", "GNOME Terminal"),
+    "gnome-terminal": ("GNOME Terminal", "🖥️", "GNOME Terminal"),
+    "konsole": ("Konsole", "🖥️", "Konsole"),
+    "kitty": ("kitty", "🐱", "kitty"),
+    "alacritty": ("Alacritty", "🖥️", "Alacritty"),
+    "wezterm-gui": ("WezTerm", "💻", "WezTerm"),
+    "wezterm": ("WezTerm", "💻", "WezTerm"),
+    "tmux: server": ("tmux", "🪟", "tmux"),
+    "tmux": ("tmux", "🪟", "tmux"),
+    "code": ("VSCode", "📟", "Code"),
+    "cursor": ("Cursor", "💠", "Cursor"),
+    "windsurf": ("Windsurf", "🌊", "Windsurf"),
+    "xfce4-terminal": ("Xfce Terminal", "🖥️", "Xfce Terminal"),
+    "tilix": ("Tilix", "🖥️", "Tilix"),
+    "foot": ("foot", "🖥️", "foot"),
+    "ghostty": ("Ghostty", "👻", "Ghostty"),
+}
+
 WINDOWS_APP_INFO = {
     "vscode": ("VSCode", "📟", "Code"),
     "cursor": ("Cursor", "💠", "Cursor"),
@@ -37,48 +52,49 @@ WINDOWS_APP_INFO = {
 }
 
 
-def get_terminal_app_macos() -> tuple[str, str, str]:
-    """Detect which terminal or editor app is hosting the current process."""
+def get_terminal_app_macos(pid: Optional[int] = None) -> tuple[str, str, str]:
+    """Detect which terminal or editor app is hosting the given process."""
     try:
-        pid = os.getpid()
-        for _ in range(10):
-            result = subprocess.run(
-                ["ps", "-o", "ppid=,comm=", "-p", str(pid)],
-                capture_output=True,
-                text=True,
-                timeout=0.5,
-            )
-            if result.returncode != 0:
-                break
-
-            output = result.stdout.strip()
-            if not output:
-                break
-
-            parts = output.split(None, 1)
-            if len(parts) < 2:
-                break
-
-            ppid, comm = parts[0], parts[1].lower()
+        for comm in get_ancestor_names(pid):
             for app_key, app_info in MACOS_APP_INFO.items():
                 if app_key in comm:
                     if app_key == "stable" and "warp" in comm:
                         continue
                     return app_info
-
-            pid = int(ppid)
-            if pid <= 1:
-                break
     except Exception:
         pass
 
     return ("Terminal", "🖥️", "Terminal")
 
 
-def _get_parent_process_names_windows() -> list[str]:
+def get_terminal_app_linux(pid: Optional[int] = None) -> tuple[str, str, str]:
+    """Detect the hosting terminal/editor app on Linux from /proc ancestry.
+
+    Editors are recognised from the environment first (their integrated
+    terminals export VSCODE_* / CURSOR_* variables); otherwise the nearest
+    ancestor listed in LINUX_APP_INFO wins. Inside tmux the walk ends at the
+    tmux server, since the terminal emulator is not an ancestor there.
+    """
+    env_result = _detect_terminal_from_env()
+    if env_result:
+        return env_result
+    try:
+        for comm in get_ancestor_names(pid):
+            app_info = LINUX_APP_INFO.get(comm)
+            if app_info:
+                return app_info
+    except Exception:
+        pass
+    return ("Terminal", "🖥️", "")
+
+
+def _get_parent_process_names_windows(pid: Optional[int] = None) -> list[str]:
     """Walk the Windows process tree upward and return lowercase names."""
     names: list[str] = []
     try:
+        import ctypes
+        import ctypes.wintypes
+
         kernel32 = ctypes.windll.kernel32
 
         th32cs_snprocess = 0x00000002
@@ -119,7 +135,7 @@ def _get_parent_process_names_windows() -> list[str]:
         finally:
             kernel32.CloseHandle(snap)
 
-        current_pid = os.getpid()
+        current_pid = pid or os.getpid()
         visited = set()
         while current_pid and current_pid not in visited:
             visited.add(current_pid)
@@ -156,13 +172,13 @@ def _detect_terminal_from_env() -> Optional[tuple[str, str, str]]:
     return None
 
 
-def get_terminal_app_windows() -> tuple[str, str, str]:
+def get_terminal_app_windows(pid: Optional[int] = None) -> tuple[str, str, str]:
     """Detect the hosting terminal/editor app on Windows."""
     env_result = _detect_terminal_from_env()
     if env_result:
         return env_result
 
-    parent_names = _get_parent_process_names_windows()
+    parent_names = _get_parent_process_names_windows(pid)
     for name in parent_names:
         if "cursor" in name:
             return ("Cursor", "💠", "Cursor")
@@ -190,12 +206,16 @@ def get_terminal_app_wsl() -> tuple[str, str, str]:
     return ("Terminal", "🖥️", "")
 
 
-def get_terminal_app() -> tuple[str, str, str]:
-    """Detect which terminal/editor app is hosting the current process."""
+def get_terminal_app(pid: Optional[int] = None) -> tuple[str, str, str]:
+    """Detect which terminal/editor app is hosting a process.
+
+    Walks from the current process by default; the hook daemon passes the pid
+    of the hook that forwarded the event instead.
+    """
     if IS_MACOS:
-        return get_terminal_app_macos()
+        return get_terminal_app_macos(pid)
     if IS_WSL:
         return get_terminal_app_wsl()
     if IS_WINDOWS:
-        return get_terminal_app_windows()
-    return ("Terminal", "🖥️", "")
+        return get_terminal_app_windows(pid)
+    return get_terminal_app_linux(pid)
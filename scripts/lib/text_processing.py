@@ -1,17 +1,24 @@
 """
 Compatibility facade for text-processing helpers.
+
+Names resolve on first access (PEP 562) so importing the facade does not
+pull in the transcript reader and cleanup tables until something uses them.
 """
 
-from .message_cleanup import (
-    SKIP_PHRASES,
-    clean_message_for_notification,
-    detect_action_emoji,
-    find_content_line as _find_content_line,
-    should_skip_line as _should_skip_line,
-)
-from .project_identity import get_project_color, get_project_name
-from .task_summary import get_task_summary
-from .transcript_io import read_last_lines
+from importlib import import_module
+
+_EXPORTS = {
+    "SKIP_PHRASES": ("message_cleanup", "SKIP_PHRASES"),
+    "clean_message_for_notification": ("message_cleanup", "clean_message_for_notification"),
+    "detect_action_emoji": ("message_cleanup", "detect_action_emoji"),
+    "_find_content_line": ("message_cleanup", "find_content_line"),
+    "leading_lines": ("message_cleanup", "leading_lines"),
+    "_should_skip_line": ("message_cleanup", "should_skip_line"),
+    "get_project_color": ("project_identity", "get_project_color"),
+    "get_project_name": ("project_identity", "get_project_name"),
+    "get_task_summary": ("task_summary", "get_task_summary"),
+    "read_last_lines": ("transcript_io", "read_last_lines"),
+}
 
 __all__ = [
     "SKIP_PHRASES",
@@ -20,5 +27,20 @@ __all__ = [
     "get_project_color",
     "get_project_name",
     "get_task_summary",
+    "leading_lines",
     "read_last_lines",
 ]
+
+
+def __getattr__(name: str):
+    try:
+        module_name, attr = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(f".{module_name}", __package__), attr)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
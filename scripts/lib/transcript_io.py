@@ -1,20 +1,107 @@
 """
 Transcript file helpers.
+
+Transcripts are append-only JSONL that can grow to hundreds of MB, and the
+hooks only ever care about the newest entries, so everything here reads from
+the end of the file backwards and decodes only the lines it returns.
 """
 
-from collections import deque
+from __future__ import annotations
 
+import mmap
+from typing import Iterator, Optional
 
-def read_last_lines(file_path: str, num_lines: int = 50) -> list[str]:
-    """Read the last N lines from a file using a bounded deque."""
+BLOCK_SIZE = 64 * 1024
+
+
+def _iter_reverse_mmap(handle, start: int, end: int) -> Iterator[bytes]:
+    """Yield lines between start and end, newest first, from a read-only mmap."""
+    with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        end = min(end, len(mapped))
+        while end > start:
+            # Skip the newline terminating this line when looking for its start.
+            line_start = max(mapped.rfind(b"\n", start, end - 1) + 1, start)
+            yield mapped[line_start:end]
+            end = line_start
+
+
+def _iter_reverse_blocks(
+    handle, start: int, end: int, block_size: int
+) -> Iterator[bytes]:
+    """Yield lines between start and end, newest first, via fixed-size seeks."""
+    pending = b""
+    pos = end
+    while pos > start:
+        size = min(block_size, pos - start)
+        pos -= size
+        handle.seek(pos)
+        pending = handle.read(size) + pending
+
+        line_end = len(pending)
+        while True:
+            newline = pending.rfind(b"\n", 0, line_end - 1)
+            if newline < 0:
+                break
+            yield pending[newline + 1 : line_end]
+            line_end = newline + 1
+        pending = pending[:line_end]
+    if pending:
+        yield pending
+
+
+def iter_lines_reverse(
+    file_path: str,
+    *,
+    start: int = 0,
+    end: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    block_size: int = BLOCK_SIZE,
+) -> Iterator[bytes]:
+    """Yield raw lines (newline included) from the end of a file backwards.
+
+    Only the byte range [start, end) is considered; end defaults to the current
+    file size. max_bytes caps how far back the walk may go. Uses mmap where the
+    platform and file allow it, otherwise seeks backwards in block_size chunks.
+    Errors end the iteration quietly, like the rest of the hook helpers.
+    """
     try:
         with open(file_path, "rb") as handle:
-            lines: deque[str] = deque(maxlen=num_lines)
-            for line in handle:
-                try:
-                    lines.append(line.decode("utf-8"))
-                except UnicodeDecodeError:
-                    lines.append(line.decode("utf-8", errors="replace"))
-            return list(lines)
+            handle.seek(0, 2)
+            size = handle.tell()
+            end = size if end is None else min(end, size)
+            if max_bytes is not None:
+                start = max(start, end - max_bytes)
+            if end <= start:
+                return
+
+            try:
+                lines = _iter_reverse_mmap(handle, start, end)
+                first = next(lines, None)
+            except (OSError, ValueError):
+                lines = _iter_reverse_blocks(handle, start, end, block_size)
+                first = next(lines, None)
+            if first is None:
+                return
+            yield first
+            yield from lines
     except Exception:
-        return []
+        return
+
+
+def decode_line(raw: bytes) -> str:
+    """Decode a transcript line, replacing invalid UTF-8 rather than failing."""
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw.decode("utf-8", errors="replace")
+
+
+def read_last_lines(file_path: str, num_lines: int = 50) -> list[str]:
+    """Read the last N lines from a file without scanning it from the start."""
+    lines: list[str] = []
+    for raw in iter_lines_reverse(file_path):
+        if len(lines) >= num_lines:
+            break
+        lines.append(decode_line(raw))
+    lines.reverse()
+    return lines
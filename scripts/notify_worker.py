@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Detached notification worker.
+
+Spawned by lib/notifications.send_notification(blocking=False) so the hook
+process can exit right away while this process runs the platform's whole
+blocking fallback chain (terminal-notifier → osascript, notify-send, WinRT
+toast / WSL balloon) and records the outcome in the debug log.
+
+Usage:
+    notify_worker.py '{"title": ..., "message": ..., "subtitle": ..., "app_name": ...}'
+"""
+
+import json
+import sys
+import time
+
+from lib.notifications import send_notification
+from lib.debug_log import log_event
+from lib.profiling import run_profiled
+from lib.stage_timing import set_hook, span
+
+if __name__ == "__main__":
+    set_hook("notify_worker")
+    start = time.monotonic()
+    try:
+        fields = json.loads(sys.argv[1])
+        with span("delivery"):
+            run_profiled(
+                "notify_worker",
+                lambda: send_notification(
+                    fields.get("title", ""),
+                    fields.get("message", ""),
+                    fields.get("subtitle", ""),
+                    fields.get("app_name", ""),
+                    blocking=True,
+                ),
+            )
+        log_event("worker.finished", seconds=round(time.monotonic() - start, 3))
+    except Exception as exc:
+        log_event("worker.failed", error=exc)
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Show current notification rate-limit bucket levels (read-only).
+
+Usage:
+    rate_limits.py
+"""
+
+import time
+
+from lib.rate_limit import BUCKETS_PATH, get_rate_limit, read_buckets, refill
+
+if __name__ == "__main__":
+    buckets = read_buckets()
+    if not buckets:
+        print(f"No rate-limit state in {BUCKETS_PATH}")
+    else:
+        now = time.time()
+        print(f"{'BUCKET':<50} {'TOKENS':>12}  LAST EVENT")
+        for bucket in sorted(buckets, key=lambda b: b.updated, reverse=True):
+            event_type = bucket.key.split(":", 1)[0]
+            limit = get_rate_limit(event_type)
+            if limit is None:
+                level = "off"
+            else:
+                level = f"{refill(bucket, limit, now):.1f}/{limit[0]:g}"
+            print(f"{bucket.key:<50} {level:>12}  {now - bucket.updated:.0f}s ago")
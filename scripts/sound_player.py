@@ -7,11 +7,13 @@ Cross-platform: macOS, Windows, WSL, and Linux desktops.
 import subprocess
 from typing import Optional
 
+from lib.capabilities import first_available
 from lib.platform_runtime import (
     IS_MACOS,
     IS_WINDOWS,
     USES_WINDOWS_GUI,
     run_powershell,
+    spawn_detached,
 )
 
 # Sound definitions by type and platform
@@ -68,39 +70,20 @@ def play_sound_windows(sound_file: str) -> None:
         pass
 
 
-def _play_linux_with_player(player: str, sound_file: str) -> bool:
-    """Try a Linux audio player command in detached mode."""
-    if not sound_file:
-        return False
-    try:
-        subprocess.Popen(
-            [player, sound_file],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            stdin=subprocess.DEVNULL,
-            start_new_session=True,
-            close_fds=True,
-        )
-        return True
-    except Exception:
-        return False
-
-
 def play_sound_linux(sound_file: str) -> None:
-    """Play a sound on Linux using common desktop audio tools when available."""
-    for player in ("paplay", "aplay"):
-        if _play_linux_with_player(player, sound_file):
-            return
-
+    """Play a sound on Linux using common desktop audio tools when available.
+    Players are looked up in the capability registry, so nothing is spawned
+    just to find out a player is missing."""
     try:
-        subprocess.Popen(
-            ["canberra-gtk-play", "-i", "complete"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            stdin=subprocess.DEVNULL,
-            start_new_session=True,
-            close_fds=True,
-        )
+        if sound_file:
+            player = first_available(("paplay", "aplay"))
+            if player:
+                spawn_detached([player[1], sound_file])
+                return
+
+        canberra = first_available(("canberra-gtk-play",))
+        if canberra:
+            spawn_detached([canberra[1], "-i", "complete"])
     except Exception:
         pass
 
@@ -1,12 +1,29 @@
 """Claude Code Statusline — cross-platform, no external dependencies.
 
-Reads JSON from stdin, outputs: model │ branch │ ●●●●○○○○○○ 42%
+Reads JSON from stdin, outputs: model │ branch │ ±3 ↑1 │ ●●●●○○○○○○ 42% │ forecast
 Color shifts at 60/75/90% context usage.
+
+Runs on every UI refresh, so it never spawns a process: the branch is read
+from .git/HEAD directly (worktrees and submodules via their `gitdir:` file;
+a detached HEAD shows its tag from packed-refs / refs/tags, else a short
+SHA). Rendered lines are cached under the CLI home keyed by the payload and
+the HEAD file's stat, so an identical refresh just replays the last line.
+
+Dirty-file and ahead/behind counts come from lib/git_status.py, which
+serves the last `git status` result at once and refreshes it in a detached
+`statusline.py --refresh-git-status <root>` run when it goes stale.
+
+The optional forecast segment (lib/context_forecast.py) shows how fast the
+session's context is growing, e.g. "+2.1k/turn ~14 turns to 90%".
 """
 
+import contextlib
 import json
-import subprocess
+import os
 import sys
+import zlib
+from pathlib import Path
+from typing import Optional
 
 # ANSI codes
 RESET = "\033[0m"
@@ -15,27 +32,214 @@ YELLOW = "\033[33m"
 RED = "\033[31m"
 
 
-def get_git_branch() -> str:
+RENDER_CACHE_PATH = Path(__file__).resolve().parent.parent / ".statusline_cache.json"
+RENDER_CACHE_ENTRIES = 32
+
+SHORT_SHA_LENGTH = 7
+
+
+def find_repo(start: str) -> tuple[Optional[Path], Optional[Path]]:
+    """(work tree root, git directory) for start, or (None, None).
+
+    The git directory is .git itself, or where a `.git` file's `gitdir:`
+    line points (worktrees, submodules).
+    """
+    current = Path(start).resolve()
+    for directory in (current, *current.parents):
+        dot_git = directory / ".git"
+        if dot_git.is_dir():
+            return directory, dot_git
+        if dot_git.is_file():
+            try:
+                content = dot_git.read_text(encoding="utf-8").strip()
+            except OSError:
+                return None, None
+            if not content.startswith("gitdir:"):
+                return None, None
+            return directory, (directory / content[len("gitdir:"):].strip()).resolve()
+    return None, None
+
+
+def get_git_branch(git_dir: Optional[Path]) -> str:
+    """Current branch; a short SHA when detached; "" outside a repo."""
+    if git_dir is None:
+        return ""
     try:
-        result = subprocess.run(
-            ["git", "branch", "--show-current"],
-            capture_output=True,
-            text=True,
-            timeout=2,
-        )
-        if result.returncode == 0:
-            return result.stdout.strip()
-    except Exception:
-        pass
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return ""
+    if head.startswith("ref:"):
+        ref = head[len("ref:"):].strip()
+        return ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ref
+    if len(head) >= SHORT_SHA_LENGTH:
+        return head[:SHORT_SHA_LENGTH]
     return ""
 
 
+def _head_stamp(git_dir: Optional[Path]) -> str:
+    """Changes whenever HEAD is rewritten (checkout, switch, detach)."""
+    if git_dir is None:
+        return "-"
+    try:
+        stat = (git_dir / "HEAD").stat()
+    except OSError:
+        return "-"
+    return f"{stat.st_mtime_ns}:{stat.st_ino}:{stat.st_size}"
+
+
+def get_git_status(root: Optional[Path]):
+    """Last known dirty/ahead/behind counts (lib/git_status.py), or None."""
+    if root is None:
+        return None
+    try:
+        from lib.git_status import cached_status
+    except ImportError:
+        return None
+    return cached_status(str(root))
+
+
+def format_git_status(status) -> str:
+    """e.g. "±3 ↑1 ↓2"; empty when clean and in sync (or unknown)."""
+    if status is None:
+        return ""
+    parts = []
+    if status.dirty:
+        parts.append(f"±{status.dirty}")
+    if status.ahead:
+        parts.append(f"↑{status.ahead}")
+    if status.behind:
+        parts.append(f"↓{status.behind}")
+    return " ".join(parts)
+
+
+def get_forecast(data: dict):
+    """Record this refresh's context usage and forecast its growth, or None."""
+    session_id = data.get("session_id")
+    ctx = data.get("context_window")
+    if not session_id or not isinstance(ctx, dict):
+        return None
+    try:
+        from lib.context_forecast import record_and_forecast
+    except ImportError:
+        return None
+    return record_and_forecast(str(session_id), ctx)
+
+
+def format_forecast(forecast) -> str:
+    """e.g. "+2.1k/turn ~14 turns to 90%"; empty without a usable estimate."""
+    if forecast is None or forecast.turns_left is None:
+        return ""
+    if forecast.in_tokens:
+        per_turn = forecast.per_turn
+        amount = f"{per_turn / 1000:.1f}k" if per_turn >= 1000 else f"{per_turn:.0f}"
+    else:
+        amount = f"{forecast.per_turn:.1f}%"
+    if forecast.turns_left == 0:
+        left = "<1 turn"
+    else:
+        left = f"~{forecast.turns_left} turn" + ("s" if forecast.turns_left > 1 else "")
+    return f"+{amount}/turn {left} to 90%"
+
+
+def _cache_key(raw: str, cwd: str, git_dir: Optional[Path], git_status: str) -> str:
+    encoded = raw.encode("utf-8", errors="replace")
+    return (
+        f"{zlib.crc32(encoded):08x}:{len(encoded)}:{cwd}:"
+        f"{_head_stamp(git_dir)}:{git_status}"
+    )
+
+
+def _load_render_cache() -> dict:
+    try:
+        with open(RENDER_CACHE_PATH, "r", encoding="utf-8") as handle:
+            cache = json.load(handle)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_render_cache(cache: dict, key: str, line: str) -> None:
+    """Remember a rendered line, keeping the RENDER_CACHE_ENTRIES newest."""
+    cache.pop(key, None)
+    cache[key] = line
+    for stale in list(cache)[:-RENDER_CACHE_ENTRIES]:
+        del cache[stale]
+    try:
+        tmp_path = RENDER_CACHE_PATH.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(cache, handle)
+        os.replace(tmp_path, RENDER_CACHE_PATH)
+    except OSError:
+        pass
+
+
+def _stage(name: str):
+    """Time a stage into the hook latency histograms (hook_stats.py), when the
+    shared hook library is installed alongside."""
+    try:
+        from lib.stage_timing import set_hook, span
+    except ImportError:
+        return contextlib.nullcontext()
+    set_hook("statusline")
+    return span(name)
+
+
 def main() -> None:
+    if sys.argv[1:2] == ["--refresh-git-status"] and len(sys.argv) > 2:
+        from lib.git_status import refresh
+
+        refresh(sys.argv[2])
+        return
+    with _stage("total"):
+        _render()
+
+
+def _run_profiled(func) -> None:
+    """Run under cProfile when CLAUDE_HOOKS_PROFILE is set (hook_profile.py)."""
+    try:
+        from lib.profiling import run_profiled
+    except ImportError:
+        func()
+        return
+    run_profiled("statusline", func)
+
+
+def _render() -> None:
     try:
-        data = json.loads(sys.stdin.read())
+        with _stage("stdin"):
+            raw = sys.stdin.read()
+            data = json.loads(raw)
     except (json.JSONDecodeError, EOFError):
         return
+    if not isinstance(data, dict):
+        return
+
+    workspace = data.get("workspace") or {}
+    cwd = (
+        (workspace.get("current_dir") if isinstance(workspace, dict) else None)
+        or data.get("cwd")
+        or os.getcwd()
+    )
+    with _stage("git"):
+        root, git_dir = find_repo(cwd)
+        git_status = format_git_status(get_git_status(root))
+
+    key = _cache_key(raw, cwd, git_dir, git_status)
+    cache = _load_render_cache()
+    line = cache.get(key)
+    if line is None:
+        # Only a changed payload can carry new usage, so samples are only
+        # recorded (and the forecast recomputed) on a cache miss.
+        forecast = format_forecast(get_forecast(data))
+        line = _render_line(data, git_dir, git_status, forecast)
+        _save_render_cache(cache, key, line)
+    sys.stdout.write(line)
+
 
+def _render_line(
+    data: dict, git_dir: Optional[Path], git_status: str = "", forecast: str = ""
+) -> str:
+    """The statusline for a parsed payload."""
     # Parse model and context usage
     model_info = data.get("model") or {}
     model = (
@@ -46,7 +250,7 @@ def main() -> None:
     ctx = data.get("context_window") or {}
     percent = int(ctx.get("used_percentage") or 0)
 
-    branch = get_git_branch()
+    branch = get_git_branch(git_dir)
 
     # Build progress bar (10 dots)
     filled = min(percent // 10, 10)
@@ -66,10 +270,14 @@ def main() -> None:
     parts = [model]
     if branch:
         parts.append(branch)
+    if git_status:
+        parts.append(git_status)
     parts.append(f"{color}{bar}  {percent}%{RESET}" if color else f"{bar}  {percent}%")
+    if forecast:
+        parts.append(forecast)
 
-    sys.stdout.write(" │ ".join(parts))
+    return " │ ".join(parts)
 
 
 if __name__ == "__main__":
-    main()
+    _run_profiled(main)
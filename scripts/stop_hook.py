@@ -8,122 +8,270 @@ Previously: 2-4 seconds (two Python processes, each spawning PowerShell).
 
 Supports both:
 - Claude Code: Stop hook (reads transcript_path from stdin JSON)
-- Codex CLI: notify hook (reads last-assistant-message from stdin JSON)
+- Codex CLI: notify hook (reads last-assistant-message from the JSON
+  argument Codex appends to the command, or from stdin)
 
 Flow:
-1. Play completion sound immediately (afplay/winsound async = instant)
-2. Read stdin for hook data
-3. Debounce: skip if last notification was <10s ago
-4. Fire-and-forget the toast notification (Popen, don't wait)
+1. Read the hook payload (argv JSON, else stdin under a short deadline)
+2. Forward to the resident daemon if CLAUDE_HOOKS_DAEMON is enabled and
+   it is running (see hook_daemon.py); otherwise handle in-process:
+3. Rate limit: a token bucket per project (lib/rate_limit.py) drops
+   completions from a project that is notifying too often
+4. Coalesce: the first completion after a quiet period is delivered
+   immediately; completions within the next 10s are queued and delivered
+   as one aggregated toast by a detached `--flush-queue` run (lib/coalescing.py)
+5. Resolve summary, terminal, project and (for immediate deliveries)
+   terminal focus concurrently, each under its own deadline (late probes
+   fall back to defaults)
+6. Skip delivery when the originating terminal is focused
+7. Fire-and-forget the toast notification (detached worker, don't wait)
 """
 
-import datetime
-import json
 import os
 import sys
-import time
 from pathlib import Path
+from typing import Optional
 
-from sound_player import get_sound, play_sound
-from lib.platform_runtime import CLI_HOME, DEBUG_LOG_PATH, log_debug
-from lib.terminal_app_detection import get_terminal_app
-from lib.text_processing import get_project_name, get_task_summary
-from lib.notifications import send_notification_async
+from lib.daemon_client import forward_to_daemon
+from lib.deadlines import Stage, run_with_deadlines
+from lib.debug_log import log_event, new_event_id, set_context
+from lib.hook_input import read_hook_payload
+from lib.profiling import run_profiled
+from lib.stage_timing import record as record_stage
+from lib.stage_timing import set_hook, span, timed
 
-# Debounce: minimum seconds between notifications
-# Each CLI gets its own debounce file (derived from script location)
-DEBOUNCE_SECONDS = 10
-_DEBOUNCE_FILE = CLI_HOME / ".last_notification_ts"
+# Per-stage latency budgets (seconds) for the concurrent probes. Together with
+# sound and delivery they keep the hook under the 5s timeout set by the installer.
+STAGE_BUDGETS = {
+    "summary": 2.0,
+    "terminal": 1.0,
+    "project": 0.5,
+    "focus": 0.75,
+}
 
-
-def _should_debounce() -> bool:
-    """Check if we should skip notification due to debounce window."""
-    try:
-        if _DEBOUNCE_FILE.exists():
-            with open(_DEBOUNCE_FILE, "r", encoding="utf-8") as f:
-                last_ts = float(f.read().strip())
-            if time.time() - last_ts < DEBOUNCE_SECONDS:
-                return True
-    except Exception:
-        pass
-    return False
-
-
-def _update_debounce() -> None:
-    """Record current timestamp for debounce tracking."""
-    try:
-        with open(_DEBOUNCE_FILE, "w", encoding="utf-8") as f:
-            f.write(str(time.time()))
-    except Exception:
-        pass
-
-
-def _load_input_data() -> dict:
-    """Read hook input from stdin, defaulting to an empty payload on failure."""
-    try:
-        return json.load(sys.stdin)
-    except Exception:
-        return {}
+# What terminal detection reports when it cannot tell.
+UNKNOWN_TERMINAL = ("Terminal", "🖥️", "")
 
 
 def _get_completion_message(input_data: dict) -> str:
     """Build the notification message for either Claude Code or Codex CLI."""
+    from lib.message_cleanup import leading_lines
+    from lib.task_summary import get_task_summary
+
     transcript_path = input_data.get("transcript_path")
     if transcript_path and Path(transcript_path).exists():
-        return get_task_summary(transcript_path, DEBUG_LOG_PATH)
+        return get_task_summary(transcript_path, incremental=True)
 
     assistant_message = input_data.get("last-assistant-message")
     if assistant_message:
-        message = str(assistant_message)
-        lines = [line.strip() for line in message.split("\n") if line.strip()]
+        lines = leading_lines(str(assistant_message), 1)
         return lines[0][:120] if lines else "Task completed"
 
     return "Task completed"
 
 
-def _build_notification_context(input_data: dict) -> tuple[str, str, str, str]:
-    """Resolve project and terminal metadata for the notification."""
+def _resolve_project(input_data: dict) -> tuple[str, str]:
+    """Project name and colour indicator for the session's working directory."""
+    from lib.project_identity import get_project_name
+
+    return get_project_name(input_data.get("cwd", os.getcwd()))
+
+
+def _gather_notification_fields(
+    input_data: dict, origin_pid: Optional[int] = None, *, check_focus: bool = False
+) -> dict:
+    """Run the summary, terminal and project probes concurrently.
+
+    Terminal and project come from the SessionStart record when one exists;
+    otherwise they are probed alongside the summary. With check_focus, a
+    cached focus probe runs alongside them too. Each probe has its own
+    latency budget (STAGE_BUDGETS); one that misses it falls back to its
+    default so the hook stays well inside its timeout.
+    """
+    from lib.focus_detection import is_terminal_focused_cached
+    from lib.session_records import read_session_record
+    from lib.terminal_app_detection import get_terminal_app
+
     cwd = input_data.get("cwd", os.getcwd())
-    project_name, color = get_project_name(cwd)
-    terminal_name, _terminal_emoji, terminal_app_name = get_terminal_app()
-    return project_name, color, terminal_name, terminal_app_name
+    record = read_session_record(input_data.get("session_id"), cwd)
 
+    stages = {
+        "summary": Stage(
+            timed("summary", lambda: _get_completion_message(input_data)),
+            STAGE_BUDGETS["summary"],
+            "Task completed",
+        ),
+    }
+    if record is None:
+        stages["terminal"] = Stage(
+            timed("terminal", lambda: get_terminal_app(origin_pid)),
+            STAGE_BUDGETS["terminal"],
+            UNKNOWN_TERMINAL,
+        )
+        stages["project"] = Stage(
+            timed("project", lambda: _resolve_project(input_data)),
+            STAGE_BUDGETS["project"],
+            (Path(cwd).name, "⚪️"),
+        )
+    if check_focus:
+        # Without a record the terminal is still being detected, so any
+        # focused terminal/editor counts.
+        focus_app = record["terminal"][2] if record else ""
+        stages["focus"] = Stage(
+            timed("focus", lambda: is_terminal_focused_cached(focus_app)),
+            STAGE_BUDGETS["focus"],
+            False,
+        )
 
-def main() -> None:
-    # 1. Play sound immediately (async/non-blocking)
-    play_sound(get_sound("completion"))
+    results, missed = run_with_deadlines(stages)
+    if missed:
+        log_event("stages.deadline_missed", stages=missed)
+    for stage in missed:
+        record_stage(stage, timeout=True)
+    if "summary" not in missed and results["summary"] == "Task completed":
+        record_stage("summary", fallback=True)
+    if (
+        "terminal" in stages
+        and "terminal" not in missed
+        and results["terminal"] == UNKNOWN_TERMINAL
+    ):
+        record_stage("terminal", fallback=True)
+    if record is not None:
+        log_event("stages.session_record")
+        results.update(record)
+    return results
+
+
+def _rate_limit_key(input_data: dict) -> tuple[str, str]:
+    """(event type, bucket key) for the rate limiter.
+
+    Buckets are per project directory by default; set
+    CLAUDE_HOOKS_RATE_LIMIT_KEY=session to limit each session separately.
+    """
+    event_type = str(
+        input_data.get("hook_event_name") or input_data.get("type") or "stop"
+    ).lower()
+    if os.environ.get("CLAUDE_HOOKS_RATE_LIMIT_KEY", "").lower() == "session":
+        session_id = input_data.get("session_id") or input_data.get("thread-id")
+        if session_id:
+            return event_type, str(session_id)
+    return event_type, str(input_data.get("cwd", os.getcwd()))
+
+
+def _deliver(events: list[dict], *, sound: bool = True) -> None:
+    """Send one (possibly aggregated) notification, with the completion sound."""
+    from sound_player import get_sound, play_sound
+    from lib.coalescing import aggregate
+    from lib.notifications import send_notification_async
 
-    # 2. Read hook input from stdin
-    input_data = _load_input_data()
+    with span("delivery"):
+        if sound:
+            play_sound(get_sound("completion"))
+        notification = aggregate(events)
+        log_event(
+            "notify.send",
+            events=len(events),
+            title=notification["title"],
+            subtitle=notification["subtitle"],
+        )
+        send_notification_async(
+            title=notification["title"],
+            subtitle=notification["subtitle"],
+            message=notification["message"],
+            app_name=notification["app_name"],
+        )
 
-    timestamp = datetime.datetime.now().isoformat()
-    log_debug(f"{timestamp} | stop_hook | keys: {list(input_data.keys())}")
 
-    # 3. Debounce — skip if recent notification
-    if _should_debounce():
-        log_debug("  → Debounced, skipping notification")
+def handle_event(input_data: dict, origin_pid: Optional[int] = None) -> None:
+    """Deliver, or queue for coalescing, the notification for one hook event.
+
+    Heavy modules are imported lazily rather than at the top so the daemon
+    client path in main() never pays for them.
+    """
+    from lib.coalescing import claim_window, enqueue, release_window
+    from lib.rate_limit import allow
+
+    set_context(event_id=new_event_id(), session_id=input_data.get("session_id"))
+    log_event("stop_hook.event", keys=list(input_data))
+
+    # 0. Per-project (or per-session) token bucket
+    event_type, rate_key = _rate_limit_key(input_data)
+    with span("rate_limit"):
+        allowed = allow(event_type, rate_key)
+    if not allowed:
+        log_event("rate_limit.skipped", event_type=event_type, key=rate_key)
         return
 
-    # 4. Build notification content
-    project_name, color, terminal_name, terminal_app_name = _build_notification_context(
-        input_data
-    )
-    message = _get_completion_message(input_data)
+    # 1. First completion in a quiet period is delivered now; later ones queue
+    with span("coalesce"):
+        stale_events = claim_window()
 
-    log_debug(
-        f"  → Sending async notification | Project: {project_name} | Terminal: {terminal_name}"
+    # 2. Build notification content (concurrent, deadline-bounded)
+    fields = _gather_notification_fields(
+        input_data, origin_pid, check_focus=stale_events is not None
     )
+    project_name, color = fields["project"]
+    terminal_name, _terminal_emoji, terminal_app_name = fields["terminal"]
+    event = {
+        "title": f"{terminal_name} {color}",
+        "subtitle": project_name,
+        "message": fields["summary"],
+        "app_name": terminal_app_name,
+    }
 
-    # 5. Fire-and-forget notification
-    send_notification_async(
-        title=f"{terminal_name} {color}",
-        subtitle=project_name,
-        message=message,
-        app_name=terminal_app_name,
-    )
+    # 3. Inside an open window: queue for the aggregated end-of-window toast
+    if stale_events is None:
+        if enqueue(event):
+            log_event("coalesce.queued", project=project_name)
+            return
+        # Queue lock unavailable: deliver on our own rather than lose it.
+        stale_events = []
+
+    # 4. Nobody needs a toast or a sound for the terminal they are looking at
+    if fields.get("focus") and not stale_events:
+        log_event("focus.skipped", project=project_name)
+        # Nothing was shown, so completions right after this one should not
+        # be held back (or toasted later at the end of a window) for it.
+        release_window()
+        return
+
+    # 5. Fire-and-forget notification (folding in anything a lost flusher left)
+    _deliver(stale_events + [event])
+
+
+def flush_queue() -> None:
+    """Detached flusher: deliver the events queued during the current window,
+    unless their terminal is focused by then."""
+    from lib.coalescing import aggregate, drain_at_window_end, release_window
+    from lib.focus_detection import is_terminal_focused_cached
+
+    set_hook("flush_queue")
+    set_context(event_id=new_event_id(), session_id=None)
+    events = drain_at_window_end()
+    if not events:
+        return
+    with span("focus"):
+        focused = is_terminal_focused_cached(aggregate(events)["app_name"])
+    if focused:
+        log_event("focus.skipped", events=len(events))
+        release_window()
+        return
+    _deliver(events)
+
+
+def main() -> None:
+    if "--flush-queue" in sys.argv[1:]:
+        flush_queue()
+        return
+    with span("total"):
+        with span("stdin"):
+            input_data = read_hook_payload()
+        if forward_to_daemon(input_data):
+            return
+        handle_event(input_data)
 
-    _update_debounce()
 
+set_hook("stop_hook")
 
 if __name__ == "__main__":
-    main()
+    run_profiled("stop_hook", main)
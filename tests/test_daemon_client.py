@@ -0,0 +1,67 @@
+"""When the Stop hook trusts the resident daemon with an event."""
+
+import socket
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from lib import daemon_client  # noqa: E402
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix domain sockets only")
+class ForwardToDaemonTest(unittest.TestCase):
+    def _forward(self, reply):
+        """forward_to_daemon() against a fake daemon sending reply (None: never)."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "daemon.sock"
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(str(path))
+            server.listen(1)
+            done = threading.Event()
+
+            def serve():
+                connection, _ = server.accept()
+                connection.makefile("rb").readline()
+                if reply is not None:
+                    connection.sendall(reply)
+                done.wait(2)
+                connection.close()
+
+            thread = threading.Thread(target=serve, daemon=True)
+            thread.start()
+            try:
+                with mock.patch.multiple(
+                    daemon_client,
+                    DAEMON_ENABLED=True,
+                    DAEMON_SUPPORTED=True,
+                    SOCKET_PATH=path,
+                    REPLY_TIMEOUT=0.2,
+                ), mock.patch.object(daemon_client, "spawn_daemon") as spawn:
+                    forwarded = daemon_client.forward_to_daemon({"hook_event_name": "Stop"})
+                self.assertFalse(spawn.called)
+                return forwarded
+            finally:
+                done.set()
+                thread.join(2)
+                server.close()
+
+    def test_accepted(self):
+        self.assertTrue(self._forward(b'{"status": "accepted"}\n'))
+
+    def test_error_reply_falls_back(self):
+        self.assertFalse(self._forward(b'{"status": "error: bad request"}\n'))
+
+    def test_garbled_reply_falls_back(self):
+        self.assertFalse(self._forward(b"\x00\n"))
+
+    def test_wedged_daemon_falls_back(self):
+        self.assertFalse(self._forward(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
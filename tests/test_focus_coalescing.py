@@ -0,0 +1,65 @@
+"""Focus suppression across a coalescing window."""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+# The scripts' CLI home is the checkout here; keep hook stats out of it.
+os.environ["CLAUDE_HOOKS_STATS"] = "0"
+
+import stop_hook  # noqa: E402
+from lib import coalescing, focus_detection  # noqa: E402
+
+EVENT = {"title": "VSCode", "subtitle": "api", "message": "Fixed the parser", "app_name": "Code"}
+
+
+class FocusCoalescingTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.multiple(
+            coalescing,
+            QUEUE_PATH=Path(tmp.name) / "queue.json",
+            QUEUE_LOCK_PATH=Path(tmp.name) / "queue.lock",
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_release_reopens_delivery(self):
+        self.assertEqual(coalescing.claim_window(), [])
+        coalescing.release_window()
+        self.assertEqual(coalescing.claim_window(), [])
+
+    def test_release_keeps_window_with_queued_events(self):
+        coalescing.claim_window()
+        with mock.patch.object(coalescing, "_spawn_flusher"):
+            coalescing.enqueue(EVENT)
+        coalescing.release_window()
+        self.assertIsNone(coalescing.claim_window())
+
+    def _flush(self, focused):
+        coalescing._save_state(
+            {"window_end": time.time() - 1, "pending": [EVENT], "flusher_since": time.time()}
+        )
+        with mock.patch.object(
+            focus_detection, "is_terminal_focused_cached", return_value=focused
+        ) as probe, mock.patch.object(stop_hook, "_deliver") as deliver:
+            stop_hook.flush_queue()
+        probe.assert_called_once_with("Code")
+        return deliver
+
+    def test_flusher_skips_focused_terminal(self):
+        self.assertFalse(self._flush(focused=True).called)
+        self.assertEqual(coalescing.claim_window(), [])
+
+    def test_flusher_delivers_when_unfocused(self):
+        self._flush(focused=False).assert_called_once_with([EVENT])
+
+
+if __name__ == "__main__":
+    unittest.main()
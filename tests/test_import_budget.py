@@ -0,0 +1,30 @@
+"""Hook entry points stay within their checked-in import-time budgets."""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "tools"))
+
+import check_import_budget  # noqa: E402
+
+RUNS = 5
+
+
+class ImportBudgetTest(unittest.TestCase):
+    def test_entry_points_within_budget(self):
+        budgets = check_import_budget.load_budgets()
+        for entry, module in check_import_budget.ENTRY_POINTS.items():
+            with self.subTest(entry=entry):
+                self.assertIn(entry, budgets, f"no budget in {check_import_budget.BUDGET_PATH.name}")
+                median = check_import_budget.measure(entry, module, RUNS)
+                self.assertLessEqual(
+                    median,
+                    budgets[entry],
+                    f"{entry} imports in {median:.1f}ms, over its {budgets[entry]:.1f}ms budget "
+                    "(tools/check_import_budget.py shows the breakdown)",
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
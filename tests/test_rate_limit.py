@@ -0,0 +1,44 @@
+"""Rate-limit overrides from CLAUDE_HOOKS_RATE_LIMIT_<EVENT>."""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from lib import rate_limit  # noqa: E402
+
+ENV_NAME = "CLAUDE_HOOKS_RATE_LIMIT_STOP"
+
+
+class RateLimitOverrideTest(unittest.TestCase):
+    def test_valid_override(self):
+        with mock.patch.dict(os.environ, {ENV_NAME: "10/30"}):
+            self.assertEqual(rate_limit.get_rate_limit("stop"), (10.0, 30.0))
+
+    def test_off(self):
+        with mock.patch.dict(os.environ, {ENV_NAME: "off"}):
+            self.assertIsNone(rate_limit.get_rate_limit("stop"))
+
+    def test_malformed_override_uses_default(self):
+        default = rate_limit.DEFAULT_RATE_LIMITS["stop"]
+        for override in ("5/0", "-1/60", "5/-60", "inf/60", "5/nan", "5", "a/b", "5/60/1"):
+            with self.subTest(override=override):
+                with mock.patch.dict(os.environ, {ENV_NAME: override}):
+                    self.assertEqual(rate_limit.get_rate_limit("stop"), default)
+
+    def test_malformed_override_does_not_break_allow(self):
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.multiple(
+            rate_limit,
+            BUCKETS_PATH=Path(tmp) / "buckets.bin",
+            BUCKETS_LOCK_PATH=Path(tmp) / "buckets.lock",
+        ), mock.patch.dict(os.environ, {ENV_NAME: "5/0"}):
+            self.assertTrue(rate_limit.allow("stop", "/project"))
+            self.assertTrue(rate_limit.allow("stop", "/project"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""Terminal notifications from detached helpers, which have no /dev/tty."""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR / "scripts"))
+
+from lib import coalescing, notifications, platform_runtime  # noqa: E402
+
+_SOUND_STUB = '''
+def get_sound(sound_type):
+    return None
+
+
+def play_sound(sound_file):
+    pass
+'''
+
+
+class DetachedEnvTest(unittest.TestCase):
+    def test_names_controlling_tty(self):
+        with mock.patch.dict(os.environ, {"CLAUDE_HOOKS_TTY": ""}), mock.patch.object(
+            platform_runtime, "controlling_tty_path", return_value="/dev/pts/7"
+        ):
+            self.assertEqual(platform_runtime.detached_env()["CLAUDE_HOOKS_TTY"], "/dev/pts/7")
+
+    def test_keeps_forwarded_tty(self):
+        # The daemon child already carries the client's terminal.
+        with mock.patch.dict(os.environ, {"CLAUDE_HOOKS_TTY": "/dev/pts/3"}):
+            self.assertEqual(platform_runtime.detached_env()["CLAUDE_HOOKS_TTY"], "/dev/pts/3")
+
+    def test_flusher_gets_tty(self):
+        with mock.patch.object(
+            coalescing, "detached_env", return_value={"CLAUDE_HOOKS_TTY": "/dev/pts/7"}
+        ), mock.patch.object(coalescing, "spawn_detached") as spawn:
+            coalescing._spawn_flusher()
+        self.assertEqual(spawn.call_args.kwargs["env"], {"CLAUDE_HOOKS_TTY": "/dev/pts/7"})
+
+
+class PrefersTerminalTest(unittest.TestCase):
+    def _prefers(self, env, notify_send):
+        with mock.patch.dict(os.environ, env, clear=True), mock.patch.multiple(
+            notifications, IS_MACOS=False, USES_WINDOWS_GUI=False
+        ), mock.patch.object(notifications, "which", return_value=notify_send):
+            return notifications.prefers_terminal_notifications()
+
+    def test_tmux_without_notify_send(self):
+        self.assertTrue(self._prefers({"TMUX": "/tmp/tmux-0/default,1,0", "DISPLAY": ":0"}, None))
+
+    def test_tmux_with_notify_send_on_a_desktop(self):
+        env = {"TMUX": "/tmp/tmux-0/default,1,0", "DISPLAY": ":0"}
+        self.assertFalse(self._prefers(env, "/usr/bin/notify-send"))
+
+    def test_ssh(self):
+        self.assertTrue(self._prefers({"SSH_CONNECTION": "a 1 b 2", "DISPLAY": ":0"}, "x"))
+
+
+@unittest.skipIf(sys.platform == "win32", "POSIX sessions only")
+class FlusherWithoutTtyTest(unittest.TestCase):
+    """Runs `stop_hook.py --flush-queue` in its own session, as spawned."""
+
+    def test_aggregated_notification_reaches_forwarded_tty(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cli_home = Path(tmp) / ".claude"
+            shutil.copytree(
+                REPO_DIR / "scripts",
+                cli_home / "scripts",
+                ignore=shutil.ignore_patterns("__pycache__", "*.pyc"),
+            )
+            (cli_home / "scripts" / "sound_player.py").write_text(_SOUND_STUB, encoding="utf-8")
+            event = {"title": "VSCode", "subtitle": "api", "message": "Fixed the parser", "app_name": ""}
+            (cli_home / ".notify_queue.json").write_text(
+                json.dumps(
+                    {"window_end": time.time() - 1, "pending": [event, event], "flusher_since": time.time()}
+                ),
+                encoding="utf-8",
+            )
+            tty = Path(tmp) / "tty"
+            tty.touch()
+
+            env = {
+                key: value
+                for key, value in os.environ.items()
+                if not key.startswith("CLAUDE_HOOKS_") and key not in ("TMUX", "DISPLAY")
+            }
+            env.update({"SSH_CONNECTION": "10.0.0.1 22 10.0.0.2 22", "CLAUDE_HOOKS_TTY": str(tty)})
+            subprocess.run(
+                [sys.executable, str(cli_home / "scripts" / "stop_hook.py"), "--flush-queue"],
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+                timeout=30,
+                check=True,
+            )
+
+            written = tty.read_bytes()
+            self.assertTrue(written.startswith(b"\x1b]9;"), written)
+            self.assertIn("2 tasks finished - in api: Fixed the parser".encode(), written)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the notification hot paths.
+
+Generates synthetic Claude Code transcripts (JSONL) at several sizes with a
+realistic mix of giant tool-result lines, multi-block assistant messages and
+stray non-UTF-8 bytes, then times the functions every Stop event and
+statusline refresh runs on them:
+
+    read_last_lines, get_task_summary (last 50 lines and adaptive),
+    clean_message_for_notification, detect_action_emoji, statusline.main
+
+The statusline is timed twice: "statusline" changes the payload every sample
+so each one renders (a render-cache miss), "statusline_cached" replays one
+payload so each one is served from the render cache.
+
+Each case runs in its own interpreter so peak RSS is per case, against a
+throwaway copy of scripts/ so the caches and samples the scripts keep under
+their CLI home stay out of the working tree. Results (throughput, p50/p99
+latency, peak RSS) are written as JSON and compared against a stored
+baseline (bench_baseline.json next to this script); a case whose p50 or p99
+grows past the tolerance is reported as a regression.
+
+Usage:
+    python3 tools/benchmark.py [--sizes 1,16,256] [--output results.json]
+    python3 tools/benchmark.py --sizes 1,16,256,1024     # include the 1 GB corpus
+    python3 tools/benchmark.py --save-baseline           # re-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+TOOLS_DIR = Path(__file__).resolve().parent
+REPO_DIR = TOOLS_DIR.parent
+SCRIPTS_DIR = REPO_DIR / "scripts"
+BASELINE_PATH = TOOLS_DIR / "bench_baseline.json"
+DEFAULT_CORPUS_DIR = Path(tempfile.gettempdir()) / "claude-hooks-bench"
+
+DEFAULT_SIZES_MB = (1, 16, 256)
+CORPUS_SEED = 1234
+
+# Per-case sampling: stop after TIME_BUDGET seconds or MAX_SAMPLES samples,
+# whichever comes first, but always take at least MIN_SAMPLES.
+TIME_BUDGET_SECONDS = 2.0
+MIN_SAMPLES = 5
+MAX_SAMPLES = 500
+
+# A case regresses when p50 or peak RSS exceeds the baseline by this fraction
+# (twice that for the noisier p99). Latency deltas under the floor are
+# timer/scheduler noise.
+DEFAULT_TOLERANCE = 0.25
+LATENCY_FLOOR_MS = 1.0
+
+# Cases that read a transcript run once per corpus size; the rest run once.
+FILE_CASES = ("read_last_lines", "task_summary", "task_summary_adaptive")
+TEXT_CASES = ("clean_message", "detect_emoji", "statusline", "statusline_cached")
+
+_WORDS = (
+    "update refactor parser config handler cache request response module "
+    "test build deploy fix error token stream buffer session window index "
+    "query schema migrate render layout service worker queue retry limit"
+).split()
+
+_OPENERS = (
+    "Perfect!",
+    "Done.",
+    "Great, that worked.",
+    "## Summary",
+    "I've fixed the failing test in `parser.py`.",
+    "**Implemented** the retry logic for the queue worker.",
+    "Created a new migration for the sessions table.",
+    "Updated the README with the new install steps - see below.",
+)
+
+SAMPLE_MESSAGES = (
+    "## **Fixed** the `race condition` in the session cache - details below",
+    "I've implemented __streaming__ support for large transcripts.",
+    "Refactored the token bucket; all 42 tests pass now!",
+    "Created `lib/coalescing.py` and updated *stop_hook.py* to use it.",
+    "Perfect! Everything is deployed and the build is green.",
+    "Removed the unused `legacy_notify()` helper and its callers",
+)
+
+
+# =============================================================================
+# Synthetic corpus
+# =============================================================================
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _entry(kind: str, message: dict, rng: random.Random) -> bytes:
+    record = {
+        "type": kind,
+        "uuid": f"{rng.getrandbits(64):016x}",
+        "timestamp": "2026-01-01T00:00:00.000Z",
+        "sessionId": "bench",
+        "message": message,
+    }
+    return json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _assistant_text(rng: random.Random) -> bytes:
+    """Multi-block assistant message: thinking, text, and a tool call."""
+    text = "\n".join(
+        [rng.choice(_OPENERS), ""]
+        + [_sentence(rng, rng.randint(6, 20)) for _ in range(rng.randint(2, 12))]
+    )
+    content = [
+        {"type": "thinking", "thinking": _sentence(rng, rng.randint(20, 200))},
+        {"type": "text", "text": text},
+    ]
+    if rng.random() < 0.5:
+        content.append(
+            {
+                "type": "tool_use",
+                "id": f"toolu_{rng.getrandbits(48):012x}",
+                "name": "Bash",
+                "input": {"command": "ls -la"},
+            }
+        )
+    return _entry("assistant", {"role": "assistant", "content": content}, rng)
+
+
+def _assistant_tool_only(rng: random.Random) -> bytes:
+    content = [
+        {
+            "type": "tool_use",
+            "id": f"toolu_{rng.getrandbits(48):012x}",
+            "name": rng.choice(("Read", "Edit", "Grep", "Bash")),
+            "input": {"file_path": f"/src/{rng.choice(_WORDS)}.py"},
+        }
+    ]
+    return _entry("assistant", {"role": "assistant", "content": content}, rng)
+
+
+def _tool_result(rng: random.Random, size: int) -> bytes:
+    """A user-side tool result; large ones carry raw non-UTF-8 bytes too."""
+    chunk = _sentence(rng, 12) + "\n"
+    body = (chunk * (size // len(chunk) + 1))[:size]
+    content = [
+        {
+            "type": "tool_result",
+            "tool_use_id": f"toolu_{rng.getrandbits(48):012x}",
+            "content": body,
+        }
+    ]
+    line = _entry("user", {"role": "user", "content": content}, rng)
+    if size > 4096 and rng.random() < 0.3:
+        # Binary file contents dumped by a tool: invalid UTF-8 mid-string.
+        cut = len(line) // 2
+        line = line[:cut] + b"\xff\xfe\xc3(\x80" + line[cut:]
+    return line
+
+
+def generate_transcript(path: Path, size_bytes: int, seed: int = CORPUS_SEED) -> None:
+    """Write a transcript of about size_bytes that ends in a run of tool-only
+    turns, so summary extraction has to look past them."""
+    rng = random.Random(seed + size_bytes)
+    tmp_path = path.with_suffix(".partial")
+    written = 0
+    with open(tmp_path, "wb") as handle:
+        while written < size_bytes:
+            handle.write(_entry("user", {"role": "user", "content": _sentence(rng, 15)}, rng))
+            for _ in range(rng.randint(1, 6)):
+                roll = rng.random()
+                if roll < 0.05:
+                    # Giant tool results: file dumps, test logs, search output.
+                    line = _tool_result(rng, rng.randint(256 * 1024, 2 * 1024 * 1024))
+                elif roll < 0.5:
+                    line = _tool_result(rng, rng.randint(200, 16 * 1024))
+                else:
+                    line = _assistant_tool_only(rng)
+                handle.write(line)
+            handle.write(_assistant_text(rng))
+            written = handle.tell()
+
+        for _ in range(30):
+            handle.write(_assistant_tool_only(rng))
+            handle.write(_tool_result(rng, rng.randint(200, 64 * 1024)))
+    os.replace(tmp_path, path)
+
+
+def ensure_corpus(corpus_dir: Path, sizes_mb: list[int]) -> dict[int, Path]:
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    for size_mb in sizes_mb:
+        path = corpus_dir / f"transcript-{size_mb}mb.jsonl"
+        if not path.exists():
+            print(f"Generating {path} ...", file=sys.stderr)
+            generate_transcript(path, size_mb * 1024 * 1024)
+        paths[size_mb] = path
+    return paths
+
+
+# =============================================================================
+# Cases (run inside a child interpreter)
+# =============================================================================
+
+
+def _case_callable(
+    case: str, transcript: Optional[str], scripts_dir: Path
+) -> Callable[[], object]:
+    sys.path.insert(0, str(scripts_dir))
+    from lib.text_processing import (
+        clean_message_for_notification,
+        detect_action_emoji,
+        get_task_summary,
+        read_last_lines,
+    )
+
+    if case == "read_last_lines":
+        return lambda: read_last_lines(transcript, 50)
+    if case == "task_summary":
+        return lambda: get_task_summary(transcript)
+    if case == "task_summary_adaptive":
+        return lambda: get_task_summary(transcript, adaptive=True)
+    if case == "clean_message":
+        return lambda: [clean_message_for_notification(m) for m in SAMPLE_MESSAGES]
+    if case == "detect_emoji":
+        return lambda: [detect_action_emoji(m) for m in SAMPLE_MESSAGES]
+    if case in ("statusline", "statusline_cached"):
+        import statusline
+
+        samples = iter(range(sys.maxsize))
+
+        def _payload() -> str:
+            # A render-cache miss needs a new payload; the session's cost
+            # counters change on every real refresh anyway.
+            sample = 0 if case == "statusline_cached" else next(samples)
+            return json.dumps(
+                {
+                    "session_id": "bench",
+                    "model": {"display_name": "Opus"},
+                    "context_window": {"used_percentage": 42},
+                    "cost": {"total_duration_ms": sample},
+                    "transcript_path": transcript or "",
+                    "cwd": str(REPO_DIR),
+                }
+            )
+
+        def _statusline() -> None:
+            stdin, stdout = sys.stdin, sys.stdout
+            sys.stdin, sys.stdout = io.StringIO(_payload()), io.StringIO()
+            try:
+                statusline.main()
+            finally:
+                sys.stdin, sys.stdout = stdin, stdout
+
+        return _statusline
+    raise ValueError(f"unknown case: {case}")
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def run_case(case: str, transcript: Optional[str], scripts_dir: Path) -> dict:
+    func = _case_callable(case, transcript, scripts_dir)
+    func()  # warm-up: imports, page cache, regex compilation
+
+    samples: list[float] = []
+    deadline = time.perf_counter() + TIME_BUDGET_SECONDS
+    while len(samples) < MIN_SAMPLES or (
+        len(samples) < MAX_SAMPLES and time.perf_counter() < deadline
+    ):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+
+    result = {
+        "samples": len(samples),
+        "p50_ms": _percentile(samples, 0.50) * 1000,
+        "p99_ms": _percentile(samples, 0.99) * 1000,
+        "ops_per_sec": len(samples) / sum(samples),
+        "peak_rss_bytes": _peak_rss_bytes(),
+    }
+    if transcript and case in FILE_CASES:
+        size_mb = os.path.getsize(transcript) / (1024 * 1024)
+        result["file_mb"] = round(size_mb, 1)
+        # Nominal throughput: transcript megabytes handled per second, which
+        # is what the reverse readers are meant to make size-independent.
+        result["mb_per_sec"] = size_mb / statistics.median(samples)
+    return result
+
+
+def build_sandbox(root: Path) -> Path:
+    """Copy scripts/ into a throwaway CLI home; returns the copied scripts dir."""
+    import shutil
+
+    scripts_dir = root / ".claude" / "scripts"
+    shutil.copytree(
+        SCRIPTS_DIR, scripts_dir, ignore=shutil.ignore_patterns("__pycache__", "*.pyc")
+    )
+    return scripts_dir
+
+
+def _run_case_subprocess(case: str, transcript: Optional[Path], scripts_dir: Path) -> dict:
+    cmd = [
+        sys.executable,
+        str(Path(__file__).resolve()),
+        "--case",
+        case,
+        "--scripts-dir",
+        str(scripts_dir),
+    ]
+    if transcript:
+        cmd += ["--transcript", str(transcript)]
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=True,
+        stdin=subprocess.DEVNULL,
+        cwd=scripts_dir.parent,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"case {case} failed:\n{result.stderr.strip()}")
+    return json.loads(result.stdout)
+
+
+# =============================================================================
+# Baseline comparison
+# =============================================================================
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Descriptions of the metrics that regressed past the tolerance."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric, allowed in (("p50_ms", tolerance), ("p99_ms", 2 * tolerance)):
+            limit = max(base[metric] * (1 + allowed), base[metric] + LATENCY_FLOOR_MS)
+            if result[metric] > limit:
+                regressions.append(
+                    f"{name}: {metric} {base[metric]:.3f} → {result[metric]:.3f}"
+                )
+        old_rss, new_rss = base.get("peak_rss_bytes"), result.get("peak_rss_bytes")
+        if old_rss and new_rss and new_rss > old_rss * (1 + tolerance):
+            regressions.append(
+                f"{name}: peak RSS {_format_rss(old_rss)} → {_format_rss(new_rss)}"
+            )
+    return regressions
+
+
+def _format_rss(value: Optional[int]) -> str:
+    return f"{value / (1024 * 1024):.1f}MB" if value else "-"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Notification hot-path microbenchmarks")
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES_MB),
+        help="comma-separated transcript sizes in MB (default: %(default)s)",
+    )
+    parser.add_argument("--corpus-dir", type=Path, default=DEFAULT_CORPUS_DIR)
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument("--transcript", help=argparse.SUPPRESS)
+    parser.add_argument("--scripts-dir", type=Path, default=SCRIPTS_DIR, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(args.case, args.transcript, args.scripts_dir)))
+        return 0
+
+    sizes_mb = [int(size) for size in args.sizes.split(",") if size.strip()]
+    corpus = ensure_corpus(args.corpus_dir, sizes_mb)
+    largest = corpus[max(sizes_mb)] if sizes_mb else None
+
+    results: dict[str, dict] = {}
+    with tempfile.TemporaryDirectory(prefix="claude-hooks-bench-") as tmp:
+        scripts_dir = build_sandbox(Path(tmp))
+        for case in FILE_CASES:
+            for size_mb, path in corpus.items():
+                results[f"{case}[{size_mb}mb]"] = _run_case_subprocess(case, path, scripts_dir)
+        for case in TEXT_CASES:
+            transcript = largest if case.startswith("statusline") else None
+            results[case] = _run_case_subprocess(case, transcript, scripts_dir)
+
+    print(f"{'CASE':<32} {'P50':>10} {'P99':>10} {'OPS/S':>10} {'MB/S':>10} {'RSS':>9}")
+    for name, result in results.items():
+        mb_per_sec = result.get("mb_per_sec")
+        print(
+            f"{name:<32} {result['p50_ms']:>8.3f}ms {result['p99_ms']:>8.3f}ms "
+            f"{result['ops_per_sec']:>10.1f} "
+            f"{(f'{mb_per_sec:.0f}' if mb_per_sec else '-'):>10} "
+            f"{_format_rss(result['peak_rss_bytes']):>9}"
+        )
+
+    report = {
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    try:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\nRegressions (> {args.tolerance:.0%} slower than baseline):")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nNo regressions against {args.baseline.name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Check hook entry points against their import-time budgets.
+
+Every hook invocation is a fresh interpreter, so module-level imports are paid
+on each event before any early exit can happen. This runs
+`python -X importtime` against each entry point, takes the median cumulative
+import time over several runs and fails when it exceeds the budget checked in
+next to this script (import_budget.json).
+
+Usage:
+    python3 tools/check_import_budget.py [--runs N] [--update]
+
+--update rewrites the budget file from the current medians plus headroom.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+BUDGET_PATH = Path(__file__).resolve().parent / "import_budget.json"
+
+# Entry point (relative to the repo) → module name it is imported as.
+ENTRY_POINTS = {
+    "scripts/stop_hook.py": "stop_hook",
+    "scripts/statusline.py": "statusline",
+    "hooks/session-start.py": "session-start",
+}
+
+# Budgets written by --update leave room for slower machines and CI noise.
+UPDATE_HEADROOM = 2.0
+
+
+def measure_once(entry: str, module: str) -> float:
+    """Cumulative import time of one entry point in milliseconds."""
+    entry_dir = str((REPO_DIR / entry).parent)
+    # __import__ rather than importlib.import_module: only the former goes
+    # through the C import path that -X importtime reports.
+    code = f"import sys; sys.path.insert(0, {entry_dir!r}); __import__({module!r})"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        timeout=30,
+        stdin=subprocess.DEVNULL,
+        cwd=REPO_DIR,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{entry} failed to import:\n{result.stderr.strip()}")
+
+    # Lines look like "import time:   self [us] | cumulative | <indent>name";
+    # the entry point is the top-level (unindented) line with its name.
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].rstrip() == f" {module}":
+            return int(parts[1]) / 1000.0
+    raise RuntimeError(f"{entry}: no importtime line for {module}")
+
+
+def measure(entry: str, module: str, runs: int) -> float:
+    measure_once(entry, module)  # warm-up: writes bytecode caches
+    return statistics.median(measure_once(entry, module) for _ in range(runs))
+
+
+def load_budgets() -> dict[str, float]:
+    try:
+        with open(BUDGET_PATH, "r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7, help="runs per entry point")
+    parser.add_argument(
+        "--update", action="store_true", help="rewrite the budget file from this run"
+    )
+    args = parser.parse_args()
+
+    budgets = load_budgets()
+    measured: dict[str, float] = {}
+    failed = False
+    print(f"{'ENTRY POINT':<28} {'MEDIAN':>10} {'BUDGET':>10}")
+    for entry, module in ENTRY_POINTS.items():
+        median = measure(entry, module, max(args.runs, 1))
+        measured[entry] = median
+        budget = budgets.get(entry)
+        if budget is None:
+            status = "no budget"
+        elif median > budget:
+            status = "OVER"
+            failed = True
+        else:
+            status = "ok"
+        budget_text = f"{budget:.1f}ms" if budget is not None else "-"
+        print(f"{entry:<28} {median:>8.1f}ms {budget_text:>10}  {status}")
+
+    if args.update:
+        new_budgets = {
+            entry: float(math.ceil(value * UPDATE_HEADROOM))
+            for entry, value in measured.items()
+        }
+        BUDGET_PATH.write_text(json.dumps(new_budgets, indent=2) + "\n", encoding="utf-8")
+        print(f"Budgets written to {BUDGET_PATH}")
+        return 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Concurrent end-to-end load harness for the Stop hook.
+
+Builds a throwaway CLI home (a copy of scripts/ and hooks/ under a temp
+directory), swaps the sound player and the detached notification worker for
+recording stand-ins, then launches N stop_hook.py processes at once with
+synthetic payloads (each pointing at its own transcript with a unique
+summary) or payloads replayed from a JSONL file.
+
+While the hooks run, a sampler keeps re-reading the shared state files (the
+coalescing queue, the rate-limit buckets, the stage histograms, the focus and
+capability caches, the summary checkpoints) and records every read that does not parse. After
+the coalescing window has drained it reports:
+
+- hook process latency percentiles and events/sec
+- delivery latency percentiles (launch → recorded notification)
+- dropped and duplicated notifications, counted from the delivered
+  (aggregated) titles; synthetic payloads are also matched by job id
+- corrupted shared files, and debug-log lines that were torn or interleaved
+
+Usage:
+    python3 tools/load_test.py [-n 64] [--stagger-ms 0] [--payloads events.jsonl]
+
+Exits non-zero when anything was dropped, duplicated or corrupted.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# Everything the hooks write concurrently, relative to the CLI home.
+SHARED_JSON_FILES = (".notify_queue.json", ".focus_cache.json", ".capabilities.json")
+CHECKPOINT_DIR = "summary-checkpoints"
+DEBUG_LOG = "notification_debug.log"
+RECORDINGS = "recordings.jsonl"
+
+# Extra time, past the coalescing window, for flushers and workers to finish.
+DRAIN_GRACE_SECONDS = 15.0
+SAMPLE_INTERVAL_SECONDS = 0.005
+
+_JOB_ID = re.compile(r"load job (\d+)")
+_AGGREGATE_TITLE = re.compile(r"^(\d+) tasks finished$")
+
+# Recording stand-ins, written over the sandbox copies. Each record is one
+# short O_APPEND write, so concurrent writers cannot interleave within it.
+_RECORDER = '''
+def _record(kind, **fields):
+    import json, os, time
+    line = json.dumps({"kind": kind, "ts": time.time(), "pid": os.getpid(), **fields})
+    fd = os.open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "recordings.jsonl"),
+                 os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+    try:
+        os.write(fd, (line + "\\n").encode("utf-8"))
+    finally:
+        os.close(fd)
+'''
+
+_SOUND_STANDIN = (
+    '"""Recording stand-in for sound_player (tools/load_test.py)."""\n'
+    + _RECORDER
+    + '''
+
+def get_sound(sound_type):
+    return sound_type
+
+
+def play_sound(sound_file):
+    _record("sound", sound=sound_file)
+'''
+)
+
+_WORKER_STANDIN = (
+    '"""Recording stand-in for notify_worker (tools/load_test.py)."""\n'
+    + _RECORDER
+    + '''
+
+if __name__ == "__main__":
+    import json, sys
+    _record("notification", **json.loads(sys.argv[1]))
+'''
+)
+
+
+# =============================================================================
+# Sandbox
+# =============================================================================
+
+
+def build_sandbox(root: Path) -> Path:
+    """A CLI home with the real hooks and recording delivery backends."""
+    cli_home = root / ".claude"
+    shutil.copytree(
+        REPO_DIR / "scripts",
+        cli_home / "scripts",
+        ignore=shutil.ignore_patterns("__pycache__"),
+    )
+    shutil.copytree(
+        REPO_DIR / "hooks", cli_home / "hooks", ignore=shutil.ignore_patterns("__pycache__")
+    )
+    (cli_home / "scripts" / "sound_player.py").write_text(_SOUND_STANDIN, encoding="utf-8")
+    (cli_home / "scripts" / "notify_worker.py").write_text(_WORKER_STANDIN, encoding="utf-8")
+    return cli_home
+
+
+def _transcript_line(index: int) -> str:
+    entry = {
+        "type": "assistant",
+        "message": {
+            "role": "assistant",
+            "content": [{"type": "text", "text": f"Finished load job {index:04d} successfully."}],
+        },
+    }
+    return json.dumps(entry) + "\n"
+
+
+def synthetic_payloads(root: Path, count: int, projects: int) -> list[dict]:
+    payloads = []
+    for index in range(count):
+        project = root / "projects" / f"project-{index % projects:02d}"
+        project.mkdir(parents=True, exist_ok=True)
+        transcript = root / "transcripts" / f"session-{index:04d}.jsonl"
+        transcript.parent.mkdir(parents=True, exist_ok=True)
+        transcript.write_text(
+            '{"type":"user","message":{"role":"user","content":"go"}}\n'
+            + _transcript_line(index),
+            encoding="utf-8",
+        )
+        payloads.append(
+            {
+                "session_id": f"load-{index:04d}",
+                "transcript_path": str(transcript),
+                "cwd": str(project),
+                "hook_event_name": "Stop",
+            }
+        )
+    return payloads
+
+
+def recorded_payloads(path: Path, count: int) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as handle:
+        events = [json.loads(line) for line in handle if line.strip()]
+    if not events:
+        raise SystemExit(f"No payloads in {path}")
+    return [events[index % len(events)] for index in range(count)]
+
+
+# =============================================================================
+# Shared-file sampler
+# =============================================================================
+
+
+class Sampler(threading.Thread):
+    """Re-reads the shared state files until stopped, collecting bad reads."""
+
+    def __init__(self, cli_home: Path, binary_files: dict[str, tuple[bytes, int]]) -> None:
+        super().__init__(daemon=True)
+        self.cli_home = cli_home
+        self.binary_files = binary_files  # name -> (magic, exact size)
+        self.stop_event = threading.Event()
+        self.reads = 0
+        self.corrupt: list[str] = []
+
+    def _check_json(self, path: Path) -> None:
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return  # not created yet, or replaced mid-open
+        self.reads += 1
+        try:
+            json.loads(data)
+        except ValueError:
+            self.corrupt.append(f"{path.name}: unparseable ({len(data)} bytes)")
+
+    def _check_binary(self, path: Path, magic: bytes, expected_size: int) -> None:
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return
+        self.reads += 1
+        if len(data) != expected_size or not data.startswith(magic):
+            self.corrupt.append(f"{path.name}: {len(data)} bytes, header {data[:4]!r}")
+
+    def check_once(self) -> None:
+        for name in SHARED_JSON_FILES:
+            self._check_json(self.cli_home / name)
+        for name, (magic, size) in self.binary_files.items():
+            self._check_binary(self.cli_home / name, magic, size)
+        checkpoint_dir = self.cli_home / CHECKPOINT_DIR
+        if checkpoint_dir.is_dir():
+            for path in checkpoint_dir.glob("*.json"):
+                self._check_json(path)
+
+    def run(self) -> None:
+        while not self.stop_event.is_set():
+            self.check_once()
+            time.sleep(SAMPLE_INTERVAL_SECONDS)
+
+
+def check_debug_log(path: Path) -> list[str]:
+    """Lines that are not whole JSON records were torn or interleaved."""
+    problems = []
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return problems
+    if data and not data.endswith(b"\n"):
+        problems.append(f"{path.name}: last line unterminated")
+    for number, raw in enumerate(data.splitlines(), 1):
+        try:
+            line = raw.decode("utf-8")
+        except UnicodeDecodeError:
+            problems.append(f"{path.name}:{number}: invalid UTF-8")
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if not isinstance(record, dict) or "event" not in record:
+            problems.append(f"{path.name}:{number}: {line[:60]!r}")
+    return problems
+
+
+# =============================================================================
+# Run
+# =============================================================================
+
+
+def launch(
+    cli_home: Path, payloads: list[dict], stagger: float, env: dict
+) -> tuple[list[tuple[float, float, int]], float, float]:
+    """Run one stop_hook.py per payload at once.
+
+    Returns ([(start, end, returncode)], first start, last end).
+    """
+    hook = cli_home / "scripts" / "stop_hook.py"
+    results: list[Optional[tuple[float, float, int]]] = [None] * len(payloads)
+    barrier = threading.Barrier(len(payloads))
+
+    def _run(index: int) -> None:
+        data = json.dumps(payloads[index]).encode("utf-8")
+        barrier.wait()
+        if stagger:
+            time.sleep(index * stagger)
+        start = time.time()
+        proc = subprocess.Popen(
+            [sys.executable, str(hook)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            cwd=payloads[index].get("cwd") or str(cli_home),
+            env=env,
+            start_new_session=True,  # no controlling TTY, like a real hook
+        )
+        proc.communicate(data)
+        results[index] = (start, time.time(), proc.returncode)
+
+    threads = [threading.Thread(target=_run, args=(i,)) for i in range(len(payloads))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    finished = [r for r in results if r is not None]
+    return finished, min(r[0] for r in finished), max(r[1] for r in finished)
+
+
+def wait_for_drain(cli_home: Path, expected: int, timeout: float) -> list[dict]:
+    """Wait until every event is accounted for, or the queue went quiet."""
+    recordings_path = cli_home / RECORDINGS
+    deadline = time.time() + timeout
+    last_size, quiet_since = -1, time.time()
+    while time.time() < deadline:
+        records = read_recordings(recordings_path)
+        if delivered_count(records) >= expected:
+            time.sleep(1.0)  # let duplicates, if any, land too
+            return read_recordings(recordings_path)
+        size = recordings_path.stat().st_size if recordings_path.exists() else 0
+        if size != last_size:
+            last_size, quiet_since = size, time.time()
+        queue = _read_json(cli_home / ".notify_queue.json") or {}
+        idle = not queue.get("pending") and queue.get("flusher_since") is None
+        if idle and time.time() - quiet_since > 3.0:
+            break
+        time.sleep(0.2)
+    return read_recordings(recordings_path)
+
+
+def _read_json(path: Path) -> Optional[dict]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def read_recordings(path: Path) -> list[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            return [json.loads(line) for line in handle if line.strip()]
+    except OSError:
+        return []
+
+
+def events_in(record: dict) -> int:
+    match = _AGGREGATE_TITLE.match(record.get("title", ""))
+    return int(match.group(1)) if match else 1
+
+
+def delivered_count(records: list[dict]) -> int:
+    return sum(events_in(r) for r in records if r["kind"] == "notification")
+
+
+def _percentiles(values: list[float]) -> str:
+    if not values:
+        return "-"
+    ordered = sorted(values)
+
+    def pick(fraction: float) -> float:
+        return ordered[min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)]
+
+    return (
+        f"p50 {pick(0.5) * 1000:.0f}ms  p90 {pick(0.9) * 1000:.0f}ms  "
+        f"p99 {pick(0.99) * 1000:.0f}ms  max {ordered[-1] * 1000:.0f}ms"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Concurrent Stop hook load harness")
+    parser.add_argument("-n", "--events", type=int, default=64)
+    parser.add_argument("--projects", type=int, default=8, help="distinct project dirs")
+    parser.add_argument("--stagger-ms", type=float, default=0.0, help="delay between launches")
+    parser.add_argument("--payloads", type=Path, help="replay payloads from a JSONL file")
+    parser.add_argument("--keep", action="store_true", help="keep the sandbox directory")
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="stop-hook-load-"))
+    cli_home = build_sandbox(root)
+    sys.path.insert(0, str(cli_home / "scripts"))
+    from lib import rate_limit, stage_timing
+    from lib.coalescing import COALESCE_WINDOW_SECONDS
+
+    synthetic = args.payloads is None
+    if synthetic:
+        payloads = synthetic_payloads(root, args.events, max(args.projects, 1))
+    else:
+        payloads = recorded_payloads(args.payloads, args.events)
+
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if not key.startswith(("CLAUDE_HOOKS_", "TMUX"))
+    }
+    env.update(
+        {
+            "CLAUDE_HOOKS_DEBUG": "1",
+            # Exercise the bucket file under contention without limiting anything.
+            "CLAUDE_HOOKS_RATE_LIMIT_STOP": "1000000/1",
+            "CLAUDE_HOOKS_RATE_LIMIT_AGENT_TURN_COMPLETE": "1000000/1",
+        }
+    )
+
+    sampler = Sampler(
+        cli_home,
+        {
+            rate_limit.BUCKETS_PATH.name: (rate_limit._MAGIC, rate_limit._FILE_SIZE),
+            stage_timing.HISTOGRAM_PATH.name: (stage_timing._MAGIC, stage_timing._FILE_SIZE),
+        },
+    )
+    sampler.start()
+    print(f"Launching {len(payloads)} concurrent Stop hooks in {root} ...")
+    runs, first_start, last_end = launch(cli_home, payloads, args.stagger_ms / 1000, env)
+    records = wait_for_drain(
+        cli_home, len(payloads), COALESCE_WINDOW_SECONDS + DRAIN_GRACE_SECONDS
+    )
+    sampler.stop_event.set()
+    sampler.join()
+    sampler.check_once()
+
+    notifications = [r for r in records if r["kind"] == "notification"]
+    sounds = [r for r in records if r["kind"] == "sound"]
+    failures = [r for r in runs if r[2] != 0]
+    hook_latencies = [end - start for start, end, _ in runs]
+
+    problems: list[str] = []
+    delivered = delivered_count(records)
+    # Aggregated titles carry the true event count, including events folded
+    # away past the queue cap, so drops are counted from titles; ids (in
+    # synthetic runs) pinpoint which ones and catch duplicates.
+    dropped = max(len(payloads) - delivered, 0)
+    duplicated = max(delivered - len(payloads), 0)
+    missing: list[int] = []
+    if synthetic:
+        seen: dict[int, int] = {}
+        for record in notifications:
+            for job in _JOB_ID.findall(record.get("message", "")):
+                seen[int(job)] = seen.get(int(job), 0) + 1
+        missing = [i for i in range(len(payloads)) if i not in seen]
+        duplicated = max(duplicated, sum(count - 1 for count in seen.values()))
+    if dropped:
+        problems.append(f"{dropped} dropped notification(s), e.g. jobs {missing[:10]}")
+    if duplicated:
+        problems.append(f"{duplicated} duplicated notification(s)")
+    if failures:
+        problems.append(f"{len(failures)} hook process(es) exited non-zero")
+    problems += sampler.corrupt
+    problems += check_debug_log(cli_home / DEBUG_LOG)
+
+    # Delivery latency: each notification against the earliest launch it covers.
+    delivery_latencies = [r["ts"] - first_start for r in notifications]
+
+    makespan = max(last_end - first_start, 1e-9)
+    print(f"Hook processes:  {len(runs)} in {makespan:.2f}s ({len(runs) / makespan:.1f} events/s)")
+    print(f"Hook latency:    {_percentiles(hook_latencies)}")
+    print(f"Delivered:       {delivered} event(s) in {len(notifications)} notification(s), {len(sounds)} sound(s)")
+    print(f"Delivery after:  {_percentiles(delivery_latencies)} (from first launch)")
+    if synthetic and len(missing) > dropped:
+        print(f"Folded:          {len(missing) - dropped} event(s) counted but not listed (queue cap)")
+    print(f"Shared reads:    {sampler.reads} sampled, {len(sampler.corrupt)} corrupt")
+
+    if args.keep:
+        print(f"Sandbox kept at {root}")
+    else:
+        shutil.rmtree(root, ignore_errors=True)
+
+    if problems:
+        print("\nProblems:")
+        for problem in problems[:50]:
+            print(f"  {problem}")
+        return 1
+    print("\nNo dropped, duplicated or corrupted state")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())